@@ -0,0 +1,197 @@
+import os
+import sys
+import time
+import numpy as np
+from pathlib import Path
+
+from core.SimilarityEngine import SimilarityEngine, normalize_rows
+
+
+class IVFIndex:
+    """Inverted file index: k-means (cosine) làm coarse quantizer, mỗi cụm giữ danh sách row id
+
+    Khi truy vấn chỉ quét các hàng thuộc n_probe cụm gần nhất thay vì toàn bộ ma trận.
+    n_probe càng lớn thì recall càng cao nhưng càng chậm.
+    """
+
+    # Số hàng được gán cụm mỗi lần để giới hạn bộ nhớ tạm
+    CHUNK_ROWS = 65536
+
+    def __init__(self, centroids, offsets, ids, recall_probes=None, recall_values=None):
+        self.centroids = centroids
+        self.offsets = offsets
+        self.ids = ids
+        # Bảng recall@20 đo lúc build: n_probe -> recall
+        self.recall_probes = np.asarray(recall_probes if recall_probes is not None else [], dtype=np.int64)
+        self.recall_values = np.asarray(recall_values if recall_values is not None else [], dtype=np.float64)
+
+    @property
+    def n_lists(self):
+        return self.centroids.shape[0]
+
+    @property
+    def n_rows(self):
+        """Số hàng của ma trận lúc build (mỗi hàng nằm trong đúng một danh sách)"""
+        return len(self.ids)
+
+    @property
+    def dim(self):
+        return self.centroids.shape[1]
+
+    @classmethod
+    def build(cls, normed, n_lists=None, sample_size=100_000, n_iter=20, seed=42):
+        """Huấn luyện k-means trên một mẫu rồi gán toàn bộ hàng vào các danh sách"""
+        # Chỉ cần khi build, không import lúc ứng dụng khởi động
+        from scipy.sparse import csr_matrix
+
+        n = normed.shape[0]
+        if n_lists is None:
+            n_lists = int(np.sqrt(n))
+        n_lists = max(1, min(n_lists, n))
+
+        rng = np.random.default_rng(seed)
+        sample_idx = np.sort(rng.choice(n, min(n, max(sample_size, n_lists)), replace=False))
+        sample = np.asarray(normed[sample_idx], dtype=np.float32)
+        centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+
+        for _ in range(n_iter):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            onehot = csr_matrix(
+                (np.ones(len(sample), dtype=np.float32), (assign, np.arange(len(sample)))),
+                shape=(n_lists, len(sample)),
+            )
+            sums = np.asarray(onehot @ sample)
+            # Cụm rỗng: lấy ngẫu nhiên một điểm của mẫu làm tâm mới
+            empty = np.flatnonzero(np.bincount(assign, minlength=n_lists) == 0)
+            if len(empty):
+                sums[empty] = sample[rng.choice(len(sample), len(empty), replace=False)]
+            centroids = normalize_rows(sums).astype(np.float32)
+
+        assign = cls._assign(normed, centroids)
+        ids = np.argsort(assign, kind="stable").astype(np.int64)
+        offsets = np.zeros(n_lists + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assign, minlength=n_lists), out=offsets[1:])
+        return cls(centroids, offsets, ids)
+
+    @classmethod
+    def _assign(cls, normed, centroids):
+        assign = np.empty(normed.shape[0], dtype=np.int64)
+        for start in range(0, normed.shape[0], cls.CHUNK_ROWS):
+            chunk = np.asarray(normed[start:start + cls.CHUNK_ROWS], dtype=np.float32)
+            assign[start:start + len(chunk)] = np.argmax(chunk @ centroids.T, axis=1)
+        return assign
+
+    def candidates(self, q, n_probe):
+        """Row id (đã sắp xếp) của n_probe cụm gần q nhất"""
+        n_probe = max(1, min(n_probe, self.n_lists))
+        centroid_scores = self.centroids @ q.astype(np.float32)
+        lists = np.argpartition(-centroid_scores, n_probe - 1)[:n_probe]
+        parts = [self.ids[self.offsets[i]:self.offsets[i + 1]] for i in lists]
+        # Sắp xếp để đọc ma trận (có thể là mmap) theo thứ tự tăng dần
+        return np.sort(np.concatenate(parts))
+
+    def search(self, normed, q, k, n_probe, exclude=None):
+        """Top-k xấp xỉ: q phải đã chuẩn hoá L2"""
+        cand = self.candidates(q, n_probe)
+        if exclude is not None:
+            cand = cand[~np.isin(cand, exclude)]
+        k = min(k, len(cand))
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=normed.dtype)
+        scores = normed[cand] @ q
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return cand[top], scores[top]
+
+    def measure_recall(self, normed, n_probe, k=20, n_queries=200, seed=0):
+        """recall@k trung bình so với tìm kiếm chính xác, dùng chính các hàng làm truy vấn"""
+        rng = np.random.default_rng(seed)
+        rows = np.sort(rng.choice(normed.shape[0], min(n_queries, normed.shape[0]), replace=False))
+        Q = np.asarray(normed[rows])
+        exact, _ = SimilarityEngine(normed, normed).query_many(Q, k)
+        hits = 0
+        for q, truth in zip(Q, exact):
+            approx, _ = self.search(normed, q, k, n_probe)
+            hits += len(np.intersect1d(approx, truth))
+        return hits / (len(rows) * exact.shape[1])
+
+    def suggested_probe(self, target=0.95):
+        """n_probe nhỏ nhất đạt recall mục tiêu theo bảng đo lúc build"""
+        for probe, recall in zip(self.recall_probes, self.recall_values):
+            if recall >= target:
+                return int(probe)
+        return int(self.recall_probes[-1]) if len(self.recall_probes) else max(1, self.n_lists // 16)
+
+    def save(self, path):
+        np.savez(
+            path, centroids=self.centroids, offsets=self.offsets, ids=self.ids,
+            recall_probes=self.recall_probes, recall_values=self.recall_values,
+            n_rows=self.n_rows, dim=self.dim,
+        )
+
+    @classmethod
+    def load(cls, path):
+        """ValueError nếu n_rows/dim lưu trong file không khớp với các mảng của index"""
+        with np.load(path) as data:
+            index = cls(
+                data["centroids"], data["offsets"], data["ids"],
+                data["recall_probes"], data["recall_values"],
+            )
+            # File cũ chưa lưu n_rows/dim thì lấy từ chính các mảng
+            shape = (int(data["n_rows"]), int(data["dim"])) if "n_rows" in data else (index.n_rows, index.dim)
+        if shape != (index.n_rows, index.dim):
+            raise ValueError(f"{path}: stored shape {shape} does not match the index arrays")
+        return index
+
+
+def index_path(json_path):
+    """File index nằm cạnh file embedding, vd. doc_embeddings.ivf.npz"""
+    json_path = Path(json_path)
+    return json_path.with_name(json_path.stem + ".ivf.npz")
+
+
+def load_index(json_path, shape):
+    """Mở index đã build nếu có, không cũ hơn dữ liệu embedding và được build cho ma trận có
+    đúng shape (n_rows, dim); ngược lại trả về None
+    """
+    path = index_path(json_path)
+    if not path.exists():
+        return None
+    json_path = Path(json_path)
+    if json_path.exists() and path.stat().st_mtime < json_path.stat().st_mtime:
+        return None
+    try:
+        index = IVFIndex.load(path)
+    except ValueError:
+        return None
+    return index if (index.n_rows, index.dim) == tuple(shape) else None
+
+
+if __name__ == "__main__":
+    # python -m core.AnnIndex [thư mục dữ liệu] [số cụm]
+    from core.EmbeddingStore import load_embeddings
+
+    base_path = Path(sys.argv[1] if len(sys.argv) > 1 else os.getcwd())
+    n_lists = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    json_path = base_path / "doc_embeddings.json"
+
+    _, mU, normed = load_embeddings(json_path, "title", lower=True)
+    if normed is None:
+        normed = normalize_rows(mU).astype(np.float32)
+
+    start = time.perf_counter()
+    index = IVFIndex.build(normed, n_lists)
+    print(f"Built {index.n_lists} lists over {normed.shape[0]} docs in {time.perf_counter() - start:.1f}s")
+
+    probes = sorted({p for p in (1, 2, 4, 8, 16, 32, 64, 128) if p <= index.n_lists} | {index.n_lists})
+    recalls = []
+    for probe in probes:
+        start = time.perf_counter()
+        recall = index.measure_recall(normed, probe)
+        recalls.append(recall)
+        print(f"n_probe={probe:4d}  recall@20={recall:.3f}  ({time.perf_counter() - start:.2f}s / 200 queries)")
+
+    index.recall_probes = np.array(probes)
+    index.recall_values = np.array(recalls)
+    index.save(index_path(json_path))
+    print(f"Saved {index_path(json_path)}")
@@ -0,0 +1,147 @@
+import os
+import sys
+import json
+import time
+import argparse
+from itertools import islice
+from pathlib import Path
+
+import numpy as np
+
+from core.DataLoader import load_terms, load_docs
+from core.Quantization import PRECISIONS
+from core.QueryFolder import QueryFolder
+from core.SimilarityEngine import SimilarityEngine
+
+# terms: term -> term (Term Relevance), termdocs: term -> doc (TermDoc Relevance), docs: tiêu đề -> doc (Doc Relevance)
+MODES = ("terms", "termdocs", "docs")
+
+
+class BatchQuery:
+    """Trả lời nhiều truy vấn bằng một phép nhân ma trận cho mỗi lô, không cần Qt
+
+    Mỗi truy vấn được đổi thành một vector giống hệt cách các màn hình tìm kiếm làm
+    (tâm các term, vector fold, hoặc hàng của tiêu đề khớp nhất), rồi cả lô được chấm điểm
+    bằng SimilarityEngine.query_many.
+    """
+
+    def __init__(self, mode, engine, names, vocabulary=None, query_folder=None, title_index=None):
+        if mode not in MODES:
+            raise ValueError(f"Unknown mode {mode!r}, expected one of {MODES}")
+        self.mode = mode
+        self.engine = engine
+        self.names = names
+        self.vocabulary = vocabulary
+        self.query_folder = query_folder
+        self.title_index = title_index
+
+    def prepare(self, query):
+        """Trả về (vector, exclude, record); vector là None và record có "error" nếu không tìm được"""
+        record = {"query": query}
+        text = query.strip().lower()
+        if self.mode == "terms":
+            rows, unknown = self.vocabulary.lookup(text.split())
+            if unknown:
+                record["unknown"] = unknown
+            if not rows:
+                record["error"] = "term not found"
+                return None, None, record
+            rows = np.unique(rows)
+            return np.asarray(self.engine.normed[rows]).sum(axis=0), rows, record
+
+        if self.mode == "termdocs":
+            vector, unknown = self.query_folder.fold(text.split())
+            if unknown:
+                record["unknown"] = unknown
+            if vector is None:
+                record["error"] = "docs not found"
+            return vector, None, record
+
+        rows, _ = self.title_index.search(text, limit=1)
+        if len(rows) == 0:
+            record["error"] = "title not found"
+            return None, None, record
+        row = int(rows[0])
+        record["match"] = self.names[row]
+        return np.asarray(self.engine.normed[row]), np.array([row]), record
+
+    def search(self, queries, k=20):
+        """Top-k cho một lô truy vấn: trả về list record theo đúng thứ tự truy vấn"""
+        prepared = [self.prepare(query) for query in queries]
+        valid = [p for p in prepared if p[0] is not None]
+        if valid:
+            Q = np.vstack([vector for vector, _, _ in valid])
+            exclude = None if self.mode == "termdocs" else [rows for _, rows, _ in valid]
+            indices, scores = self.engine.query_many(Q, k, exclude)
+            for (_, _, record), row_indices, row_scores in zip(valid, indices, scores):
+                keep = np.isfinite(row_scores)
+                record["results"] = [
+                    {"name": self.names[i], "score": round(float(s), 6)}
+                    for i, s in zip(row_indices[keep], row_scores[keep])
+                ]
+        return [record for _, _, record in prepared]
+
+
+def read_queries(stream):
+    """Một truy vấn mỗi dòng, bỏ qua dòng trống"""
+    for line in stream:
+        line = line.strip()
+        if line:
+            yield line
+
+
+def build(mode, base_path, precision="float32"):
+    """Đọc phần dữ liệu mà mode cần và dựng BatchQuery tương ứng"""
+    if mode in ("terms", "termdocs"):
+        vocabulary, mV, term_normed, topic_data, _ = load_terms(base_path, precision)
+    if mode == "terms":
+        return BatchQuery(mode, SimilarityEngine(mV, term_normed), vocabulary.terms, vocabulary=vocabulary)
+
+    doc_list, mU, doc_normed, _, title_index, _, _ = load_docs(base_path, precision)
+    doc_engine = SimilarityEngine(mU, doc_normed)
+    if mode == "termdocs":
+        folder = QueryFolder.from_topics(vocabulary, mV, topic_data)
+        return BatchQuery(mode, doc_engine, doc_list, query_folder=folder)
+    return BatchQuery(mode, doc_engine, doc_list, title_index=title_index)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="main.py query",
+        description="Answer similarity queries without the GUI and write top-k results as JSON lines.",
+    )
+    parser.add_argument("--mode", choices=MODES, default="terms",
+                        help="terms: similar terms, termdocs: docs for the terms, docs: docs similar to a title")
+    parser.add_argument("--queries-file", "--terms-file", dest="queries_file", default="-",
+                        help="one query per line, '-' reads stdin (default)")
+    parser.add_argument("-k", type=int, default=20, help="results per query")
+    parser.add_argument("--batch-size", type=int, default=1024, help="queries scored per matrix product")
+    parser.add_argument("--data", default=os.getcwd(), help="directory with the embedding files")
+    parser.add_argument("--precision", choices=PRECISIONS, default=os.environ.get("DLL_PRECISION", "float32"))
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    batch_query = build(args.mode, Path(args.data), args.precision)
+    print(f"Loaded {args.mode} data in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+    infile = sys.stdin if args.queries_file == "-" else open(args.queries_file, "r", encoding="utf-8")
+    count = 0
+    start = time.perf_counter()
+    try:
+        queries = read_queries(infile)
+        while True:
+            batch = list(islice(queries, args.batch_size))
+            if not batch:
+                break
+            for record in batch_query.search(batch, args.k):
+                sys.stdout.write(json.dumps(record, ensure_ascii=False) + "\n")
+            sys.stdout.flush()
+            count += len(batch)
+    finally:
+        if infile is not sys.stdin:
+            infile.close()
+
+    elapsed = time.perf_counter() - start
+    rate = count / elapsed if elapsed > 0 else 0.0
+    print(f"Answered {count:,} queries in {elapsed:.2f}s ({rate:,.1f} queries/s)", file=sys.stderr)
+    return 0
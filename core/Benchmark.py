@@ -0,0 +1,306 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import subprocess
+import multiprocessing
+import numpy as np
+from pathlib import Path
+
+from core.SyntheticData import generate, parse_count
+
+try:
+    import resource
+except ImportError:  # Windows: không đo được peak RSS
+    resource = None
+
+# Như SilhouetteWorker.K_RANGE và số cụm vẽ trong PlotScreen
+K_RANGE = range(2, 15)
+BEST_K = 5
+# Kết quả top-k và số tiêu đề tối đa giống các màn hình tìm kiếm
+TOP_K = 20
+MAX_CHOICES = 5000
+# Chỉ số bị coi là chậm đi khi vượt bản cũ quá tỉ lệ này
+REGRESSION_RATIO = 1.10
+
+
+def peak_rss_mb(who="self"):
+    """Peak RSS của process này hoặc của các process con đã kết thúc, None nếu không đo được"""
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF if who == "self" else resource.RUSAGE_CHILDREN)
+    # ru_maxrss tính bằng KB trên Linux, byte trên macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    return round(usage.ru_maxrss * scale / 1e6, 1)
+
+
+def percentiles(samples):
+    ms = np.asarray(samples) * 1000
+    return {
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p90_ms": round(float(np.percentile(ms, 90)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+        "mean_ms": round(float(ms.mean()), 3),
+    }
+
+
+def timed(fn, queries, warmup=5):
+    """Latency (giây) của fn cho từng truy vấn, bỏ qua vài lần chạy đầu để làm nóng page cache"""
+    for query in queries[:warmup]:
+        fn(query)
+    samples = []
+    for query in queries:
+        start = time.perf_counter()
+        fn(query)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def bench_queries(vocabulary, mV, term_normed, topic_data, doc_list, mU, doc_normed, title_index, n_queries, seed):
+    """Latency của ba đường tìm kiếm, giống hệt cách các màn hình gọi engine (không dùng cache kết quả)"""
+    from core.BatchQuery import BatchQuery
+    from core.QueryFolder import QueryFolder
+    from core.SimilarityEngine import SimilarityEngine
+
+    rng = np.random.default_rng(seed)
+    term_engine = SimilarityEngine(mV, term_normed)
+    doc_engine = SimilarityEngine(mU, doc_normed)
+    folder = QueryFolder.from_topics(vocabulary, mV, topic_data)
+    terms = vocabulary.terms
+
+    term_queries = [
+        [terms[i] for i in rng.choice(len(terms), rng.integers(1, 4), replace=False)] for _ in range(n_queries)
+    ]
+    # Tiêu đề gõ dở: một đoạn 4-12 ký tự lấy từ một tiêu đề ngẫu nhiên
+    title_queries = []
+    for row in rng.choice(len(doc_list), n_queries):
+        title = doc_list[row]
+        start = int(rng.integers(0, max(1, len(title) - 4)))
+        title_queries.append(title[start:start + int(rng.integers(4, 13))])
+
+    def search_doc(text):
+        rows, _ = title_index.search(text, limit=MAX_CHOICES)
+        if len(rows):
+            doc_engine.query_row(rows[0], k=TOP_K)
+
+    latency = {
+        "terms": percentiles(timed(lambda q: term_engine.query_rows(vocabulary.lookup(q)[0], k=TOP_K), term_queries)),
+        "termdocs": percentiles(timed(lambda q: doc_engine.query(folder.fold(q)[0], k=TOP_K), term_queries)),
+        "title_search": percentiles(timed(lambda q: title_index.search(q, limit=MAX_CHOICES), title_queries)),
+        "docs": percentiles(timed(search_doc, title_queries)),
+    }
+
+    batch = [" ".join(q) for q in term_queries]
+    batch_query = BatchQuery("termdocs", doc_engine, doc_list, query_folder=folder)
+    start = time.perf_counter()
+    batch_query.search(batch, TOP_K)
+    batch_qps = round(len(batch) / (time.perf_counter() - start), 1)
+    return latency, batch_qps
+
+
+def bench_clustering(X, backend):
+    """Thời gian của các bước SilhouetteWorker.run (không dùng ResultCache): sweep silhouette, phân cụm, PCA"""
+    from sklearn.preprocessing import normalize
+    from core.Clustering import silhouette_sweep, fit_streaming, predict_chunked, make_model, pca_project
+
+    timings = {"backend": backend}
+    start = time.perf_counter()
+    for _ in silhouette_sweep(X, K_RANGE, backend=backend):
+        pass
+    timings["sweep_s"] = round(time.perf_counter() - start, 3)
+
+    start = time.perf_counter()
+    if backend == "stream":
+        model = fit_streaming(X, BEST_K, unit_rows=True)
+        predict_chunked(model, X, unit_rows=True)
+    else:
+        model = make_model(BEST_K, backend)
+        model.fit_predict(normalize(X))
+    timings["cluster_s"] = round(time.perf_counter() - start, 3)
+
+    start = time.perf_counter()
+    pca_project(X, model.cluster_centers_, unit_rows=True)
+    timings["pca_s"] = round(time.perf_counter() - start, 3)
+    return timings
+
+
+def run_dataset(base_path, n_queries=200, cluster=("terms",), term_backend="kmeans", doc_backend="stream", seed=0):
+    """Chạy trọn bộ đo trên một thư mục dữ liệu (nên gọi trong process riêng để peak RSS không lẫn)"""
+    from core.DataLoader import load_terms, load_docs, DOCS_FILE
+    from core.EmbeddingStore import has_store
+
+    base_path = Path(base_path)
+    result = {"data": str(base_path), "format": "store" if has_store(base_path / DOCS_FILE) else "json"}
+
+    start = time.perf_counter()
+    vocabulary, mV, term_normed, topic_data, _ = load_terms(base_path)
+    result["load_terms_s"] = round(time.perf_counter() - start, 3)
+    start = time.perf_counter()
+    doc_list, mU, doc_normed, _, title_index, _, _ = load_docs(base_path)
+    result["load_docs_s"] = round(time.perf_counter() - start, 3)
+    result.update(terms=len(vocabulary), docs=len(doc_list), dim=int(mU.shape[1]))
+    result["peak_rss_load_mb"] = peak_rss_mb()
+
+    result["latency"], result["batch_qps"] = bench_queries(
+        vocabulary, mV, term_normed, topic_data, doc_list, mU, doc_normed, title_index, n_queries, seed
+    )
+
+    result["clustering"] = {}
+    if "terms" in cluster:
+        result["clustering"]["terms"] = bench_clustering(mV, term_backend)
+    if "docs" in cluster:
+        result["clustering"]["docs"] = bench_clustering(mU, doc_backend)
+    result["peak_rss_mb"] = peak_rss_mb()
+    result["peak_rss_workers_mb"] = peak_rss_mb("children")
+    return result
+
+
+def _run_child(connection, base_path, kwargs):
+    try:
+        connection.send(run_dataset(base_path, **kwargs))
+    except Exception as e:
+        connection.send({"data": str(base_path), "error": f"{type(e).__name__}: {e}"})
+    connection.close()
+
+
+def run_isolated(base_path, **kwargs):
+    """run_dataset trong một process spawn mới, để load time và peak RSS không bị ảnh hưởng bởi lần chạy trước"""
+    ctx = multiprocessing.get_context("spawn")
+    parent, child = ctx.Pipe(duplex=False)
+    process = ctx.Process(target=_run_child, args=(child, str(base_path), kwargs))
+    process.start()
+    child.close()
+    try:
+        result = parent.recv()
+    except EOFError:
+        result = {"data": str(base_path), "error": f"benchmark process exited with code {process.exitcode}"}
+    process.join()
+    return result
+
+
+def version_label():
+    """Commit git hiện tại (kèm '+dirty' nếu có thay đổi chưa commit), hoặc thời điểm chạy"""
+    root = Path(__file__).resolve().parent.parent
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=root,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=root,
+                               capture_output=True, text=True).stdout.strip()
+        return commit + ("+dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return time.strftime("%Y%m%d-%H%M%S")
+
+
+def flatten(result, prefix=""):
+    """{"latency": {"terms": {"p50_ms": ..}}} -> {"latency.terms.p50_ms": ..}, chỉ giữ giá trị số"""
+    flat = {}
+    for key, value in result.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, name + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+# Các chỉ số càng lớn càng tốt, còn lại (thời gian, bộ nhớ) càng nhỏ càng tốt
+HIGHER_IS_BETTER = ("batch_qps",)
+# Các trường mô tả dữ liệu, không phải chỉ số
+DATASET_FIELDS = ("terms", "docs", "dim")
+
+
+def compare(base, current):
+    """In bảng so sánh hai file kết quả theo từng bộ dữ liệu (docs, dim), đánh dấu chỉ số chậm đi"""
+    def runs_by_shape(report):
+        return {(r["docs"], r["dim"]): flatten(r) for r in report["runs"] if "error" not in r}
+
+    old_runs = runs_by_shape(base)
+    new_runs = runs_by_shape(current)
+    lines = [f"{base['label']} -> {current['label']}"]
+    regressions = 0
+    for shape in sorted(old_runs.keys() & new_runs.keys()):
+        old, new = old_runs[shape], new_runs[shape]
+        lines.append(f"\n{shape[0]:,} docs x {shape[1]}")
+        for name in sorted(old.keys() & new.keys()):
+            if name in DATASET_FIELDS or not old[name]:
+                continue
+            ratio = new[name] / old[name]
+            worse = ratio < 1 / REGRESSION_RATIO if name in HIGHER_IS_BETTER else ratio > REGRESSION_RATIO
+            regressions += worse
+            flag = "  <-- regression" if worse else ""
+            lines.append(f"  {name:42s} {old[name]:12.3f} {new[name]:12.3f}  x{ratio:5.2f}{flag}")
+    lines.append(f"\n{regressions} regression(s) above {REGRESSION_RATIO:.0%}")
+    return "\n".join(lines), regressions
+
+
+if __name__ == "__main__":
+    # python -m core.Benchmark --docs 10k,100k,1M --dims 20,100,300
+    # python -m core.Benchmark --data <thư mục dữ liệu có sẵn>
+    # python -m core.Benchmark --compare bench_results/old.json bench_results/new.json
+    parser = argparse.ArgumentParser(description="Benchmark loading, search latency and clustering.")
+    parser.add_argument("--docs", default="10k", help="comma separated document counts to generate, e.g. 10k,1M,10M")
+    parser.add_argument("--dims", default="20", help="comma separated embedding dimensions, e.g. 20,100,300")
+    parser.add_argument("--terms", default=None, help="term count (default: docs / 10, at least 1k)")
+    parser.add_argument("--work-dir", default="bench_data", help="where synthetic datasets are kept")
+    parser.add_argument("--data", nargs="*", default=None, help="benchmark existing data directories instead")
+    parser.add_argument("--store", action="store_true", help="convert each dataset to the binary store first")
+    parser.add_argument("--queries", type=int, default=200, help="queries per search path")
+    parser.add_argument("--cluster", default="terms", help="matrices to cluster: terms, docs, terms,docs or none")
+    parser.add_argument("--term-backend", default="kmeans", help="clustering backend for terms")
+    parser.add_argument("--doc-backend", default="stream", help="clustering backend for docs")
+    parser.add_argument("--output", default="bench_results", help="directory for the result JSON files")
+    parser.add_argument("--label", default=None, help="name of this run (default: git commit)")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "CURRENT"), help="compare two result files")
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0], encoding="utf-8") as f_base, open(args.compare[1], encoding="utf-8") as f_new:
+            text, regressions = compare(json.load(f_base), json.load(f_new))
+        print(text)
+        sys.exit(1 if regressions else 0)
+
+    if args.data:
+        datasets = [Path(p) for p in args.data]
+    else:
+        datasets = []
+        for n_docs in map(parse_count, args.docs.split(",")):
+            for dim in map(int, args.dims.split(",")):
+                n_terms = parse_count(args.terms) if args.terms else max(1000, n_docs // 10)
+                path = Path(args.work_dir) / f"docs{n_docs}_terms{n_terms}_dim{dim}"
+                if not (path / "doc_embeddings.json").exists():
+                    print(f"Generating {path} ...", file=sys.stderr)
+                    generate(path, n_docs, n_terms, dim)
+                datasets.append(path)
+
+    if args.store:
+        from core.EmbeddingStore import DATASETS, convert
+        for path in datasets:
+            for file_name, (name_key, lower) in DATASETS.items():
+                convert(path / file_name, name_key, lower)
+
+    label = args.label or version_label()
+    cluster = () if args.cluster == "none" else tuple(args.cluster.split(","))
+    report = {
+        "label": label,
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "runs": [],
+    }
+    for path in datasets:
+        print(f"Benchmarking {path} ...", file=sys.stderr)
+        result = run_isolated(path, n_queries=args.queries, cluster=cluster,
+                              term_backend=args.term_backend, doc_backend=args.doc_backend)
+        report["runs"].append(result)
+        print(json.dumps(result, indent=2), file=sys.stderr)
+
+    out_dir = Path(args.output)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    out_path = out_dir / f"{label}.json"
+    with open(out_path, "w", encoding="utf-8") as outfile:
+        json.dump(report, outfile, indent=2)
+    print(f"Saved {out_path}")
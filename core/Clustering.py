@@ -0,0 +1,132 @@
+import os
+import mmap
+import tempfile
+import multiprocessing
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.metrics import silhouette_score
+from sklearn.preprocessing import normalize
+from sklearn.decomposition import PCA
+from threadpoolctl import threadpool_limits
+
+# Trên tập lớn silhouette_score (O(n²)) chỉ tính trên một mẫu ngẫu nhiên
+SILHOUETTE_SAMPLE = 10_000
+
+# kmeans: KMeans full-batch, minibatch: MiniBatchKMeans.fit trên dữ liệu trong RAM,
+# stream: partial_fit theo từng chunk (dùng được với ma trận mmap, bộ nhớ tạm O(batch_size·d))
+BACKENDS = ("kmeans", "minibatch", "stream")
+
+# Dữ liệu của từng process con, gửi một lần qua initializer thay vì theo mỗi task
+_X = None
+_limits = None
+
+
+def make_model(k, backend="kmeans", seed=42, batch_size=4096):
+    if backend == "kmeans":
+        return KMeans(n_clusters=k, random_state=seed, n_init=10)
+    return MiniBatchKMeans(n_clusters=k, random_state=seed, batch_size=batch_size, n_init=3)
+
+
+def fit_streaming(X, k, seed=42, batch_size=4096, n_epochs=2, unit_rows=False):
+    """partial_fit MiniBatchKMeans qua từng chunk của X, không tạo bản sao toàn bộ ma trận"""
+    model = MiniBatchKMeans(n_clusters=k, random_state=seed, batch_size=batch_size, n_init=3)
+    # Chunk đầu phải có ít nhất k hàng để khởi tạo tâm cụm
+    step = max(batch_size, 3 * k)
+    rng = np.random.default_rng(seed)
+    starts = np.arange(0, X.shape[0], step)
+    for _ in range(n_epochs):
+        for start in rng.permutation(starts):
+            chunk = np.asarray(X[start:start + step], dtype=np.float64)
+            if len(chunk) < k:
+                continue
+            model.partial_fit(normalize(chunk) if unit_rows else chunk)
+    return model
+
+
+def predict_chunked(model, X, chunk_rows=65536, unit_rows=False):
+    """Gán nhãn cho toàn bộ X theo từng chunk"""
+    labels = np.empty(X.shape[0], dtype=np.int32)
+    for start in range(0, X.shape[0], chunk_rows):
+        chunk = np.asarray(X[start:start + chunk_rows], dtype=np.float64)
+        labels[start:start + len(chunk)] = model.predict(normalize(chunk) if unit_rows else chunk)
+    return labels
+
+
+def _init_worker(X):
+    global _X, _limits
+    # Ma trận được mở lại từ file .npy bằng mmap thay vì pickle toàn bộ dữ liệu sang process con
+    _X = np.load(X, mmap_mode="r")
+    # Mỗi process chỉ dùng 1 thread BLAS/OpenMP để không tranh CPU với các process khác
+    _limits = threadpool_limits(limits=1)
+
+
+def silhouette_for_k(k, seed=42, sample_size=SILHOUETTE_SAMPLE, backend="kmeans", batch_size=4096):
+    """Fit k cụm trên _X rồi tính silhouette score: trả về (k, score)"""
+    if backend == "stream":
+        model = fit_streaming(_X, k, seed, batch_size)
+        rng = np.random.default_rng(seed)
+        rows = np.sort(rng.choice(_X.shape[0], min(_X.shape[0], sample_size), replace=False))
+        sample = np.asarray(_X[rows], dtype=np.float64)
+        labels = model.predict(sample)
+        if len(np.unique(labels)) < 2:
+            return k, float("nan")
+        return k, float(silhouette_score(sample, labels))
+
+    model = make_model(k, backend, seed, batch_size)
+    model.fit(_X)
+    size = sample_size if _X.shape[0] > sample_size else None
+    score = silhouette_score(_X, model.labels_, sample_size=size, random_state=seed)
+    return k, float(score)
+
+
+def silhouette_sweep(X, K, seed=42, max_workers=None, backend="kmeans", batch_size=4096):
+    """Chạy song song mỗi k trên một process, yield (k, score) theo thứ tự hoàn thành"""
+    if max_workers is None:
+        max_workers = min(len(K), os.cpu_count() or 1)
+    source, spilled = _shared_source(X)
+    ctx = multiprocessing.get_context("spawn")
+    try:
+        with ProcessPoolExecutor(max_workers, mp_context=ctx, initializer=_init_worker, initargs=(source,)) as pool:
+            futures = [pool.submit(silhouette_for_k, k, seed, SILHOUETTE_SAMPLE, backend, batch_size) for k in K]
+            for future in as_completed(futures):
+                yield future.result()
+    finally:
+        if spilled:
+            os.remove(source)
+
+
+def _shared_source(X):
+    """Đường dẫn .npy để các process con mở X bằng mmap: trả về (path, spilled)
+
+    Ma trận mmap nguyên vẹn (np.load(mmap_mode=...)) dùng luôn file của nó; mảng khác (ma trận
+    đọc từ JSON, bản astype/chuẩn hoá, view của mmap) được ghi ra một file tạm để không phải
+    pickle cả ma trận sang từng process. spilled=True nghĩa là người gọi phải xoá file.
+    """
+    if isinstance(X, np.memmap) and X.filename and isinstance(X.base, mmap.mmap):
+        return str(X.filename), False
+    fd, path = tempfile.mkstemp(prefix="silhouette-", suffix=".npy")
+    try:
+        with os.fdopen(fd, "wb") as outfile:
+            np.save(outfile, np.asarray(X))
+    except BaseException:
+        os.remove(path)
+        raise
+    return path, True
+
+
+def pca_project(X, centers, fit_sample=100_000, seed=42, chunk_rows=65536, unit_rows=False):
+    """Chiếu X và tâm cụm xuống 2D theo từng chunk; PCA chỉ fit trên một mẫu nếu X lớn"""
+    prep = (lambda a: normalize(np.asarray(a, dtype=np.float64))) if unit_rows else np.asarray
+    if X.shape[0] > fit_sample:
+        rng = np.random.default_rng(seed)
+        rows = np.sort(rng.choice(X.shape[0], fit_sample, replace=False))
+        pca = PCA(n_components=2).fit(prep(X[rows]))
+    else:
+        pca = PCA(n_components=2).fit(prep(X))
+    X2d = np.empty((X.shape[0], 2), dtype=np.float32)
+    for start in range(0, X.shape[0], chunk_rows):
+        X2d[start:start + chunk_rows] = pca.transform(prep(X[start:start + chunk_rows]))
+    return X2d, pca.transform(centers)
+
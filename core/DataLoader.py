@@ -0,0 +1,51 @@
+import numpy as np
+
+from core.AnnIndex import load_index
+from core.EmbeddingStore import read_json_file, load_embeddings
+from core.KnnGraph import load_knn
+from core.Quantization import PRECISIONS, load_quantized
+from core.SimilarityEngine import normalize_rows
+from core.TitleIndex import TitleIndex
+from core.Vocabulary import Vocabulary
+
+# File dữ liệu trong thư mục làm việc
+TOPICS_FILE = "topics.json"
+TERMS_FILE = "term_embeddings.json"
+DOCS_FILE = "doc_embeddings.json"
+
+
+def precision_dtype(precision):
+    """dtype của ma trận embedding theo precision (int8 vẫn giữ ma trận float32 để xếp hạng lại)"""
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown precision {precision!r}, expected one of {PRECISIONS}")
+    return np.float64 if precision == "float64" else np.float32
+
+
+def load_terms(base_path, precision="float32", progress=None):
+    """Đọc topics và term embedding: trả về (vocabulary, mV, term_normed, topic_data, term_knn)
+
+    progress(rows, bytes_read, total_bytes) như core.EmbeddingStore.load_embeddings.
+    """
+    topic_data = read_json_file(base_path / TOPICS_FILE)
+    term_list, mV, term_normed = load_embeddings(
+        base_path / TERMS_FILE, "term", progress=progress, dtype=precision_dtype(precision)
+    )
+    term_knn = load_knn(base_path / TERMS_FILE, len(term_list))
+    return Vocabulary(term_list), mV, term_normed, topic_data, term_knn
+
+
+def load_docs(base_path, precision="float32", progress=None):
+    """Đọc doc embedding và các index đi kèm: trả về (doc_list, mU, doc_normed, doc_ann, title_index, doc_quantized, doc_knn)"""
+    json_path = base_path / DOCS_FILE
+    doc_list, mU, doc_normed = load_embeddings(
+        json_path, "title", lower=True, progress=progress, dtype=precision_dtype(precision)
+    )
+    doc_ann = load_index(json_path, mU.shape)
+    title_index = TitleIndex(doc_list)
+    doc_quantized = None
+    if precision == "int8":
+        if doc_normed is None:
+            doc_normed = normalize_rows(mU)
+        doc_quantized = load_quantized(json_path, doc_normed)
+    doc_knn = load_knn(json_path, len(doc_list))
+    return doc_list, mU, doc_normed, doc_ann, title_index, doc_quantized, doc_knn
@@ -0,0 +1,164 @@
+import os
+import sys
+import json
+import numpy as np
+from pathlib import Path
+
+from core.JsonIngest import stream_embeddings, ingest_parallel
+from core.SimilarityEngine import normalize_rows
+
+
+def read_json_file(path):
+    data = []
+    with open(path, "r", encoding="utf-8") as infile:
+        for line in infile:
+            data.append(json.loads(line))
+    return data
+
+
+def store_paths(json_path):
+    """Đường dẫn các file của store nhị phân tương ứng với một file JSON-lines"""
+    json_path = Path(json_path)
+    stem = json_path.with_suffix("")
+    return {
+        "matrix": stem.with_suffix(".npy"),
+        "normed": stem.with_name(stem.name + ".normed.npy"),
+        "names": stem.with_name(stem.name + ".names.txt"),
+    }
+
+
+def has_store(json_path):
+    """Store tồn tại và không cũ hơn file JSON gốc"""
+    paths = store_paths(json_path)
+    if not all(p.exists() for p in paths.values()):
+        return False
+    json_path = Path(json_path)
+    if not json_path.exists():
+        return True
+    json_mtime = json_path.stat().st_mtime
+    return all(p.stat().st_mtime >= json_mtime for p in paths.values())
+
+
+def parse_json_embeddings(path, name_key, lower=False, dtype=np.float64, progress=None, chunk_rows=10000):
+    """Đọc file JSON-lines thành (names, matrix, report), bỏ qua các dòng lỗi hoặc sai số chiều
+
+    progress(rows, bytes_read, total_bytes) được gọi sau mỗi chunk_rows dòng.
+    """
+    return stream_embeddings(path, name_key, lower, dtype=dtype, progress=progress, chunk_rows=chunk_rows)
+
+
+def format_skipped(path, report):
+    """Thông báo các dòng bị bỏ qua khi đọc file, chuỗi rỗng nếu không có"""
+    if not report["skipped"]:
+        return ""
+    lines = [f"{Path(path).name}: skipped {report['skipped']} malformed row(s)"]
+    lines += [f"  line {line_no}: {reason}" for line_no, reason in report["errors"]]
+    if report["skipped"] > len(report["errors"]):
+        lines.append("  ...")
+    return "\n".join(lines)
+
+
+# File nhỏ hơn ngưỡng này được đọc trong một process, khởi động pool không đáng
+PARALLEL_MIN_BYTES = 256 * 1024 * 1024
+
+
+def _normalize_file(matrix_path, normed_path, chunk_rows=65536):
+    """Ghi bản chuẩn hoá L2 của ma trận theo từng chunk, không đọc hết ma trận vào RAM"""
+    matrix = np.load(matrix_path, mmap_mode="r")
+    normed = np.lib.format.open_memmap(normed_path, mode="w+", dtype=np.float32, shape=matrix.shape)
+    for start in range(0, len(matrix), chunk_rows):
+        normed[start:start + chunk_rows] = normalize_rows(np.asarray(matrix[start:start + chunk_rows]))
+    normed.flush()
+    del matrix, normed
+
+
+def convert(json_path, name_key, lower=False, workers=None):
+    """Chuyển file JSON-lines sang store nhị phân (float32 .npy + file tên): trả về (rows, dim, report)
+
+    File lớn được parse song song trên `workers` process (mặc định số CPU), mỗi process ghi thẳng
+    vào file .npy của store.
+    """
+    paths = store_paths(json_path)
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and os.path.getsize(json_path) >= PARALLEL_MIN_BYTES:
+        names, report = ingest_parallel(json_path, name_key, paths["matrix"], lower, np.float32, workers)
+    else:
+        names, matrix, report = parse_json_embeddings(json_path, name_key, lower, dtype=np.float32)
+        np.save(paths["matrix"], matrix)
+        del matrix
+    _normalize_file(paths["matrix"], paths["normed"])
+    # newline="" để '\r' trong tên được giữ nguyên, mỗi tên đúng một dòng phân tách bằng '\n'
+    with open(paths["names"], "w", encoding="utf-8", newline="") as outfile:
+        outfile.write("\n".join(n.replace("\n", " ") for n in names))
+    dim = np.load(paths["matrix"], mmap_mode="r").shape[1]
+    return len(names), dim, report
+
+
+def load_store(json_path, mmap=True):
+    """Mở store bằng np.load(mmap_mode="r"): trả về (names, matrix, normed)
+
+    ValueError nếu số tên không khớp số hàng của ma trận (store hỏng hoặc ghi dở).
+    """
+    paths = store_paths(json_path)
+    mode = "r" if mmap else None
+    matrix = np.load(paths["matrix"], mmap_mode=mode)
+    normed = np.load(paths["normed"], mmap_mode=mode)
+    with open(paths["names"], "r", encoding="utf-8", newline="") as infile:
+        content = infile.read()
+    names = content.split("\n") if content else []
+    if len(names) != matrix.shape[0] or normed.shape != matrix.shape:
+        raise ValueError(
+            f"{paths['names'].name}: {len(names)} names for {matrix.shape[0]} rows in {paths['matrix'].name}"
+        )
+    return names, matrix, normed
+
+
+def load_embeddings(json_path, name_key, lower=False, progress=None, dtype=np.float32):
+    """Ưu tiên store nhị phân, nếu không có thì đọc JSON: trả về (names, matrix, normed)
+
+    Store luôn là float32; với dtype khác, ma trận được đọc hẳn vào RAM và đổi kiểu.
+    """
+    if has_store(json_path):
+        try:
+            names, matrix, normed = load_store(json_path)
+        except ValueError as e:
+            # Store không khớp thì coi như đã cũ: đọc lại từ JSON
+            if not Path(json_path).exists():
+                raise
+            print(f"Ignoring binary store: {e}", file=sys.stderr)
+            return _load_json(json_path, name_key, lower, progress, dtype)
+        if progress:
+            nbytes = store_paths(json_path)["matrix"].stat().st_size
+            progress(len(names), nbytes, nbytes)
+        if matrix.dtype != dtype:
+            matrix, normed = matrix.astype(dtype), normed.astype(dtype)
+        return names, matrix, normed
+    return _load_json(json_path, name_key, lower, progress, dtype)
+
+
+def _load_json(json_path, name_key, lower, progress, dtype):
+    names, matrix, report = parse_json_embeddings(json_path, name_key, lower, dtype=dtype, progress=progress)
+    if report["skipped"]:
+        print(format_skipped(json_path, report), file=sys.stderr)
+    return names, matrix, None
+
+
+# File JSON-lines của ứng dụng và key chứa tên của mỗi dòng
+DATASETS = {
+    "term_embeddings.json": ("term", False),
+    "doc_embeddings.json": ("title", True),
+}
+
+
+if __name__ == "__main__":
+    # python -m core.EmbeddingStore [thư mục dữ liệu]
+    base_path = Path(sys.argv[1] if len(sys.argv) > 1 else os.getcwd())
+    for file_name, (name_key, lower) in DATASETS.items():
+        json_path = base_path / file_name
+        if not json_path.exists():
+            print(f"Skip {json_path}: not found")
+            continue
+        rows, dim, report = convert(json_path, name_key, lower)
+        print(f"{json_path.name}: {rows} x {dim} -> {store_paths(json_path)['matrix'].name}")
+        if report["skipped"]:
+            print(format_skipped(json_path, report))
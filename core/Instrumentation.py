@@ -0,0 +1,169 @@
+import os
+import sys
+import json
+import time
+import threading
+from collections import deque, OrderedDict
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Bật ghi span/counter ngay từ đầu bằng DLL_TRACE=1 (cũng có thể bật/tắt lúc chạy qua tracer.enabled)
+ENABLED = os.environ.get("DLL_TRACE", "") not in ("", "0")
+# Số event tối đa giữ trong bộ nhớ, event cũ nhất bị bỏ trước
+MAX_EVENTS = 200_000
+
+
+class _NullSpan:
+    """Span khi tắt instrumentation: một object dùng chung, không đo gì"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.record(self.name, self.start, time.perf_counter_ns(), self.args)
+        return False
+
+
+class Tracer:
+    """Span thời gian có tên và counter, xuất được ra file trace của Chrome (chrome://tracing, Perfetto)
+
+    Khi enabled là False, span() trả về NULL_SPAN và count() không làm gì nên chi phí chỉ là một phép
+    kiểm tra thuộc tính. start()/finish() luôn đo (hai lần đọc đồng hồ) để giữ latency gần nhất của
+    các thao tác dài như một lượt tìm kiếm, nhưng chỉ ghi event khi enabled.
+    """
+
+    def __init__(self, enabled=False, max_events=MAX_EVENTS):
+        self.enabled = enabled
+        self.events = deque(maxlen=max_events)
+        self.counters = {}
+        # name -> thời lượng (ms) lần gần nhất, thứ tự theo lần cập nhật
+        self.last = OrderedDict()
+        self.thread_names = {}
+        self.origin = time.perf_counter_ns()
+        self.lock = threading.Lock()
+
+    def span(self, name, **args):
+        """with tracer.span("load_docs", rows=n): ..."""
+        if not self.enabled:
+            return NULL_SPAN
+        return _Span(self, name, args)
+
+    def start(self):
+        """Mốc bắt đầu của một thao tác kết thúc ở callback khác (vd. handle_search -> _show_results)"""
+        return time.perf_counter_ns()
+
+    def finish(self, name, start, **args):
+        """Kết thúc thao tác bắt đầu bằng start(): trả về thời lượng (ms), None nếu start là None"""
+        if start is None:
+            return None
+        return self.record(name, start, time.perf_counter_ns(), args)
+
+    def record(self, name, start, end, args=None):
+        duration_ms = (end - start) / 1e6
+        with self.lock:
+            self.last[name] = duration_ms
+            self.last.move_to_end(name)
+            if self.enabled:
+                self.events.append({
+                    "name": name, "ph": "X", "ts": (start - self.origin) / 1000, "dur": (end - start) / 1000,
+                    "tid": self._thread_id(), "args": args or {},
+                })
+        return duration_ms
+
+    def count(self, name, value=1):
+        """Cộng dồn counter `name`"""
+        if not self.enabled:
+            return
+        with self.lock:
+            total = self.counters.get(name, 0) + value
+            self._set_counter(name, total)
+
+    def gauge(self, name, value):
+        """Đặt giá trị hiện tại của counter `name` (vd. RSS)"""
+        if not self.enabled:
+            return
+        with self.lock:
+            self._set_counter(name, value)
+
+    def _set_counter(self, name, value):
+        self.counters[name] = value
+        self.events.append({
+            "name": name, "ph": "C", "ts": (time.perf_counter_ns() - self.origin) / 1000,
+            "tid": self._thread_id(), "args": {name: value},
+        })
+
+    def _thread_id(self):
+        tid = threading.get_ident()
+        if tid not in self.thread_names:
+            self.thread_names[tid] = threading.current_thread().name
+        return tid
+
+    def latest(self, prefix):
+        """(name, ms) của thao tác gần nhất có tên bắt đầu bằng prefix, None nếu chưa có"""
+        with self.lock:
+            for name in reversed(self.last):
+                if name.startswith(prefix):
+                    return name, self.last[name]
+        return None
+
+    def durations(self):
+        """[(name, ms)] thời lượng gần nhất của mọi thao tác, mới nhất trước"""
+        with self.lock:
+            return list(reversed(self.last.items()))
+
+    def clear(self):
+        with self.lock:
+            self.events.clear()
+            self.counters.clear()
+
+    def export_chrome_trace(self, path):
+        """Ghi file JSON theo Trace Event Format, mở bằng chrome://tracing hoặc ui.perfetto.dev"""
+        pid = os.getpid()
+        with self.lock:
+            events = [dict(event, pid=pid) for event in self.events]
+            names = dict(self.thread_names)
+        metadata = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+            for tid, name in names.items()
+        ]
+        with open(path, "w", encoding="utf-8") as outfile:
+            json.dump({"traceEvents": metadata + events, "displayTimeUnit": "ms"}, outfile)
+        return len(events)
+
+
+def current_rss_bytes():
+    """RSS hiện tại của process; ngoài Linux là peak RSS, None nếu không đo được"""
+    try:
+        with open("/proc/self/statm", "r") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    if resource is None:
+        return None
+    # ru_maxrss tính bằng KB trên Linux, byte trên macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+# Tracer dùng chung cho cả ứng dụng
+tracer = Tracer(ENABLED)
@@ -0,0 +1,301 @@
+import os
+import json
+import multiprocessing
+from collections import Counter
+from json.decoder import scanstring
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+# Số dòng lỗi tối đa giữ lại chi tiết trong report
+MAX_ERRORS = 20
+# Kích thước mỗi lần đọc khi đếm dòng
+BLOCK_BYTES = 1 << 24
+
+
+def count_lines(path, start=0, end=None):
+    """Số dòng trong đoạn byte [start, end) của file, không parse nội dung"""
+    if end is None:
+        end = os.path.getsize(path)
+    count = 0
+    last = b"\n"
+    with open(path, "rb") as infile:
+        infile.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            block = infile.read(min(BLOCK_BYTES, remaining))
+            if not block:
+                break
+            count += block.count(b"\n")
+            last = block[-1:]
+            remaining -= len(block)
+    # Dòng cuối không có '\n'
+    return count + (last != b"\n")
+
+
+def _fields(line, name_key):
+    """Tách (name, embedding) của một dòng; embedding là chuỗi các số nếu đi được đường nhanh,
+    list nếu phải json.loads cả dòng. Trả về chuỗi mô tả lỗi nếu dòng không hợp lệ.
+    """
+    try:
+        # Đường nhanh: tìm trực tiếp hai key, không dựng dict và không tạo float Python cho từng phần tử
+        key = line.index(f'"{name_key}"')
+        colon = line.index(":", key + len(name_key) + 2)
+        quote = line.index('"', colon)
+        emb_colon = line.index(":", line.index('"embedding"') + 11)
+        bracket = line.index("[", emb_colon)
+        # Giữa ':' và giá trị chỉ được có khoảng trắng, nếu không (vd. null) thì để json.loads xử lý
+        if not line[colon + 1:quote].strip() and not line[emb_colon + 1:bracket].strip():
+            name, _ = scanstring(line, quote + 1)
+            return name, line[bracket + 1:line.index("]", bracket)]
+    except ValueError:
+        pass
+
+    try:
+        item = json.loads(line)
+    except ValueError as e:
+        return f"invalid JSON ({e.msg})"
+    if not isinstance(item, dict) or name_key not in item or "embedding" not in item:
+        return f"missing '{name_key}' or 'embedding'"
+    if not isinstance(item[name_key], str) or not isinstance(item["embedding"], list):
+        return f"'{name_key}' must be a string and 'embedding' a list"
+    return item[name_key], item["embedding"]
+
+
+def _parse_vector(embedding, dtype):
+    if isinstance(embedding, str):
+        return np.fromstring(embedding, dtype=dtype, sep=",")
+    return np.asarray(embedding, dtype=dtype)
+
+
+def parse_lines(lines, name_key, lower, dim, dtype, first_line_no=1):
+    """Parse một khối dòng: trả về (names, block (m, dim), errors [(số dòng, lý do)])
+
+    Các dòng đi được đường nhanh và có đúng dim - 1 dấu phẩy được nối lại và parse bằng một lần
+    np.fromstring; các dòng còn lại (hoặc cả khối nếu số phần tử vẫn không khớp) được parse từng
+    dòng để kiểm tra số chiều và tìm dòng lỗi.
+    """
+    names = []
+    embeddings = []
+    line_nos = []
+    errors = []
+    for i, raw in enumerate(lines):
+        line = raw.decode("utf-8", errors="replace") if isinstance(raw, bytes) else raw
+        if not line.strip():
+            continue
+        fields = _fields(line, name_key)
+        if isinstance(fields, str):
+            errors.append((first_line_no + i, fields))
+            continue
+        names.append(fields[0])
+        embeddings.append(fields[1])
+        line_nos.append(first_line_no + i)
+
+    block = np.empty((len(embeddings), dim), dtype=dtype)
+    parsed = np.zeros(len(embeddings), dtype=bool)
+    # Kiểm tra số chiều từng dòng trước khi nối, để một dòng thiếu và một dòng thừa không bù cho nhau
+    fast = [j for j, e in enumerate(embeddings) if isinstance(e, str) and e.count(",") == dim - 1]
+    if fast:
+        try:
+            values = np.fromstring(",".join(embeddings[j] for j in fast), dtype=dtype, sep=",")
+            if values.size == len(fast) * dim:
+                block[fast] = values.reshape(len(fast), dim)
+                parsed[fast] = True
+        except ValueError:
+            pass
+
+    for j in np.flatnonzero(~parsed):
+        try:
+            vector = _parse_vector(embeddings[j], dtype)
+        except (ValueError, TypeError):
+            errors.append((line_nos[j], "embedding is not a list of numbers"))
+            continue
+        if vector.shape != (dim,):
+            errors.append((line_nos[j], f"embedding has {vector.size} values, expected {dim}"))
+            continue
+        block[j] = vector
+        parsed[j] = True
+
+    if not parsed.all():
+        names = [name for name, ok in zip(names, parsed) if ok]
+        block = block[parsed]
+
+    if lower:
+        names = [name.strip().lower() for name in names]
+    errors.sort()
+    return names, block, errors
+
+
+def detect_dim(path, name_key, max_lines=1000):
+    """Số chiều embedding phổ biến nhất trong max_lines dòng đầu
+
+    Lấy số chiều xuất hiện nhiều nhất chứ không phải của dòng đầu tiên, để một dòng lỗi ở đầu
+    file không làm mọi dòng đúng bị loại vì sai số chiều.
+    """
+    counts = Counter()
+    with open(path, "rb") as infile:
+        for _, raw in zip(range(max_lines), infile):
+            line = raw.decode("utf-8", errors="replace")
+            if not line.strip():
+                continue
+            fields = _fields(line, name_key)
+            if isinstance(fields, str):
+                continue
+            try:
+                counts[len(_parse_vector(fields[1], np.float64))] += 1
+            except (ValueError, TypeError):
+                continue
+    if not counts:
+        raise ValueError(f"{path}: no valid '{name_key}'/'embedding' row in the first {max_lines} lines")
+    # Hoà thì lấy số chiều gặp trước
+    return counts.most_common(1)[0][0]
+
+
+def _merge_errors(report, errors, skipped):
+    report["skipped"] += skipped
+    report["errors"] = sorted(report["errors"] + errors)[:MAX_ERRORS]
+
+
+def stream_embeddings(path, name_key, lower=False, dtype=np.float32, progress=None, chunk_rows=10000):
+    """Đọc file JSON-lines một lượt vào ma trận cấp phát trước: trả về (names, matrix, report)
+
+    Số dòng được đếm trước để cấp phát (n, dim); mỗi khối chunk_rows dòng được parse thẳng vào
+    các hàng của ma trận. Dòng lỗi / sai số chiều bị bỏ qua và ghi vào report
+    {"rows", "skipped", "errors": [(số dòng, lý do), ...]}.
+    progress(rows, bytes_read, total_bytes) được gọi sau mỗi khối.
+    """
+    total_bytes = os.path.getsize(path)
+    n_lines = count_lines(path)
+    dim = detect_dim(path, name_key)
+    matrix = np.empty((n_lines, dim), dtype=dtype)
+    names = []
+    report = {"rows": 0, "skipped": 0, "errors": []}
+
+    bytes_read = 0
+    line_no = 1
+    with open(path, "rb") as infile:
+        while True:
+            lines = [line for _, line in zip(range(chunk_rows), infile)]
+            if not lines:
+                break
+            bytes_read += sum(len(line) for line in lines)
+            block_names, block, errors = parse_lines(lines, name_key, lower, dim, dtype, line_no)
+            matrix[len(names):len(names) + len(block)] = block
+            names.extend(block_names)
+            _merge_errors(report, errors, len(errors))
+            line_no += len(lines)
+            if progress:
+                progress(len(names), bytes_read, total_bytes)
+
+    if len(names) < n_lines:
+        matrix.resize((len(names), dim), refcheck=False)
+    report["rows"] = len(names)
+    return names, matrix, report
+
+
+def split_ranges(path, parts):
+    """Chia file thành tối đa `parts` đoạn byte, mỗi đoạn bắt đầu ở đầu một dòng"""
+    size = os.path.getsize(path)
+    bounds = [0]
+    with open(path, "rb") as infile:
+        for i in range(1, parts):
+            infile.seek(max(size * i // parts, bounds[-1]))
+            infile.readline()
+            pos = infile.tell()
+            if pos >= size:
+                break
+            if pos > bounds[-1]:
+                bounds.append(pos)
+    bounds.append(size)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def _parse_range(path, start, end, row_offset, out_path, name_key, lower, dim, dtype, first_line_no, chunk_rows):
+    """Chạy trong process con: parse đoạn [start, end) và ghi thẳng vào out_path từ hàng row_offset"""
+    out = np.load(out_path, mmap_mode="r+")
+    names = []
+    errors = []
+    skipped = 0
+    line_no = first_line_no
+    with open(path, "rb") as infile:
+        infile.seek(start)
+        pos = start
+        while pos < end:
+            lines = []
+            while len(lines) < chunk_rows and pos < end:
+                line = infile.readline()
+                if not line:
+                    pos = end
+                    break
+                pos += len(line)
+                lines.append(line)
+            block_names, block, block_errors = parse_lines(lines, name_key, lower, dim, dtype, line_no)
+            out[row_offset + len(names):row_offset + len(names) + len(block)] = block
+            names.extend(block_names)
+            skipped += len(block_errors)
+            errors = sorted(errors + block_errors)[:MAX_ERRORS]
+            line_no += len(lines)
+    out.flush()
+    del out
+    return row_offset, names, errors, skipped
+
+
+def ingest_parallel(path, name_key, out_path, lower=False, dtype=np.float32, workers=None, progress=None, chunk_rows=10000):
+    """Parse file JSON-lines lớn song song trên nhiều process, ghi ma trận thẳng vào file .npy out_path
+
+    Mỗi process nhận một đoạn byte của file (đã đếm dòng trước để biết hàng bắt đầu) và ghi vào
+    out_path qua mmap, nên không có ma trận nào phải pickle giữa các process.
+    Trả về (names, report); nếu có dòng bị bỏ qua thì file được nén lại cho liền mạch.
+    """
+    workers = workers or os.cpu_count() or 1
+    total_bytes = os.path.getsize(path)
+    ranges = split_ranges(path, workers * 4)
+    dim = detect_dim(path, name_key)
+    ctx = multiprocessing.get_context("spawn")
+
+    with ProcessPoolExecutor(workers, mp_context=ctx) as pool:
+        counts = list(pool.map(count_lines, [path] * len(ranges), *zip(*ranges)))
+        row_offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        out = np.lib.format.open_memmap(out_path, mode="w+", dtype=dtype, shape=(int(row_offsets[-1]), dim))
+        del out
+
+        futures = {
+            pool.submit(
+                _parse_range, str(path), start, end, int(row_offsets[i]), str(out_path),
+                name_key, lower, dim, dtype, int(row_offsets[i]) + 1, chunk_rows,
+            ): end - start
+            for i, (start, end) in enumerate(ranges)
+        }
+        results = []
+        bytes_done = 0
+        report = {"rows": 0, "skipped": 0, "errors": []}
+        for future in as_completed(futures):
+            row_offset, names, errors, skipped = future.result()
+            results.append((row_offset, names))
+            _merge_errors(report, errors, skipped)
+            bytes_done += futures[future]
+            report["rows"] += len(names)
+            if progress:
+                progress(report["rows"], bytes_done, total_bytes)
+
+    results.sort(key=lambda r: r[0])
+    names = [name for _, part in results for name in part]
+    if report["rows"] < row_offsets[-1]:
+        _compact(out_path, results, report["rows"], dim, dtype)
+    return names, report
+
+
+def _compact(out_path, results, rows, dim, dtype):
+    """Dồn các hàng hợp lệ của từng đoạn lại liền nhau trong một file mới rồi thay thế file cũ"""
+    tmp_path = f"{out_path}.{os.getpid()}.tmp.npy"
+    src = np.load(out_path, mmap_mode="r")
+    dst = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=dtype, shape=(rows, dim))
+    pos = 0
+    for row_offset, names in results:
+        for start in range(0, len(names), 65536):
+            n = min(65536, len(names) - start)
+            dst[pos:pos + n] = src[row_offset + start:row_offset + start + n]
+            pos += n
+    dst.flush()
+    del src, dst
+    os.replace(tmp_path, out_path)
@@ -0,0 +1,173 @@
+import os
+import sys
+import time
+import numpy as np
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+from core.SimilarityEngine import SimilarityEngine, normalize_rows
+
+# Số láng giềng mặc định của mỗi hàng, bằng top-k của các màn hình tìm kiếm
+DEFAULT_K = 20
+
+
+class KnnGraph:
+    """Top-k láng giềng cosine (không gồm chính nó) của mọi hàng, lưu dạng CSR
+
+    Láng giềng của hàng r là indices[indptr[r]:indptr[r + 1]] (đã sắp giảm dần theo score),
+    score tương ứng nằm cùng vị trí trong scores (float32). Cả ba mảng được mở bằng mmap nên
+    tra một hàng chỉ đọc vài chục byte từ đĩa.
+    """
+
+    # Số hàng truy vấn / số hàng ứng viên của mỗi khối nhân ma trận:
+    # bộ nhớ tạm ≈ workers · BLOCK_ROWS · COLUMN_ROWS · 4 byte (~128MB mỗi worker)
+    BLOCK_ROWS = 2048
+    COLUMN_ROWS = 16384
+
+    def __init__(self, indptr, indices, scores):
+        self.indptr = indptr
+        self.indices = indices
+        self.scores = scores
+
+    def __len__(self):
+        return len(self.indptr) - 1
+
+    @property
+    def k(self):
+        """Số láng giềng lưu cho mỗi hàng"""
+        return int(self.indptr[1] - self.indptr[0]) if len(self) else 0
+
+    @property
+    def nbytes(self):
+        return self.indptr.nbytes + self.indices.nbytes + self.scores.nbytes
+
+    def neighbors(self, row, k=DEFAULT_K):
+        """(indices, scores) của k láng giềng gần nhất, None nếu graph lưu ít hơn k láng giềng"""
+        start, end = int(self.indptr[row]), int(self.indptr[row + 1])
+        if k > end - start and end - start < len(self) - 1:
+            return None
+        end = min(end, start + k)
+        return self.indices[start:end].astype(np.int64), np.array(self.scores[start:end])
+
+    @classmethod
+    def build(cls, normed, k=DEFAULT_K, workers=None, progress=None):
+        """Tính top-k của mọi hàng bằng các khối nhân ma trận chạy song song trên nhiều thread
+
+        Mỗi khối BLOCK_ROWS hàng truy vấn được nhân lần lượt với từng khối COLUMN_ROWS hàng của
+        normed, top-k đang có được gộp với top-k của khối mới, nên không bao giờ có ma trận điểm n×n.
+        Mỗi thread dùng BLAS một luồng để các khối chạy song song không tranh CPU.
+        progress(rows_done, n) được gọi mỗi khi xong một khối.
+        """
+        from threadpoolctl import threadpool_limits
+
+        n = normed.shape[0]
+        k = max(0, min(k, n - 1))
+        indices = np.empty((n, k), dtype=np.int32)
+        scores = np.empty((n, k), dtype=np.float32)
+
+        def run_block(start):
+            Q = np.asarray(normed[start:start + cls.BLOCK_ROWS], dtype=np.float32)
+            rows = np.arange(len(Q))
+            own = rows + start
+            best_scores = np.full((len(Q), k), -np.inf, dtype=np.float32)
+            best_indices = np.zeros((len(Q), k), dtype=np.int64)
+            for col in range(0, n, cls.COLUMN_ROWS):
+                C = np.asarray(normed[col:col + cls.COLUMN_ROWS], dtype=np.float32)
+                S = Q @ C.T
+                inside = (own >= col) & (own < col + len(C))
+                S[rows[inside], own[inside] - col] = -np.inf
+                if S.shape[1] > k:
+                    part = np.argpartition(-S, k - 1, axis=1)[:, :k]
+                else:
+                    part = np.broadcast_to(np.arange(S.shape[1]), S.shape)
+                cand_scores = np.concatenate([best_scores, np.take_along_axis(S, part, axis=1)], axis=1)
+                cand_indices = np.concatenate([best_indices, part + col], axis=1)
+                top = np.argpartition(-cand_scores, k - 1, axis=1)[:, :k]
+                best_scores = np.take_along_axis(cand_scores, top, axis=1)
+                best_indices = np.take_along_axis(cand_indices, top, axis=1)
+            order = np.argsort(-best_scores, axis=1, kind="stable")
+            indices[start:start + len(Q)] = np.take_along_axis(best_indices, order, axis=1)
+            scores[start:start + len(Q)] = np.take_along_axis(best_scores, order, axis=1)
+            return len(Q)
+
+        if k > 0:
+            workers = workers or os.cpu_count() or 1
+            with threadpool_limits(limits=1), ThreadPoolExecutor(workers) as pool:
+                done = 0
+                for count in pool.map(run_block, range(0, n, cls.BLOCK_ROWS)):
+                    done += count
+                    if progress:
+                        progress(done, n)
+
+        indptr = np.arange(n + 1, dtype=np.int64) * k
+        return cls(indptr, indices.reshape(-1), scores.reshape(-1))
+
+    def save(self, json_path):
+        paths = knn_paths(json_path)
+        for name, array in (("indptr", self.indptr), ("indices", self.indices), ("scores", self.scores)):
+            tmp = paths[name].with_name(paths[name].name + ".tmp.npy")
+            np.save(tmp, array)
+            os.replace(tmp, paths[name])
+
+    @classmethod
+    def load(cls, json_path, mmap=True):
+        paths = knn_paths(json_path)
+        mode = "r" if mmap else None
+        return cls(*(np.load(paths[name], mmap_mode=mode) for name in ("indptr", "indices", "scores")))
+
+
+def knn_paths(json_path):
+    """File graph nằm cạnh file embedding, vd. doc_embeddings.knn.indices.npy"""
+    json_path = Path(json_path)
+    return {name: json_path.with_name(f"{json_path.stem}.knn.{name}.npy") for name in ("indptr", "indices", "scores")}
+
+
+def load_knn(json_path, n_rows):
+    """Mở graph đã build nếu có, không cũ hơn file JSON và khớp số hàng của ma trận; ngược lại None"""
+    paths = knn_paths(json_path)
+    if not all(p.exists() for p in paths.values()):
+        return None
+    json_path = Path(json_path)
+    if json_path.exists() and any(p.stat().st_mtime < json_path.stat().st_mtime for p in paths.values()):
+        return None
+    graph = KnnGraph.load(json_path)
+    return graph if len(graph) == n_rows else None
+
+
+if __name__ == "__main__":
+    # python -m core.KnnGraph [thư mục dữ liệu] [k] [số thread]
+    from core.EmbeddingStore import DATASETS, load_embeddings
+
+    base_path = Path(sys.argv[1] if len(sys.argv) > 1 else os.getcwd())
+    k = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_K
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else None
+
+    for file_name, (name_key, lower) in DATASETS.items():
+        json_path = base_path / file_name
+        paths = knn_paths(json_path)
+        if not json_path.exists() and not json_path.with_suffix(".npy").exists():
+            print(f"Skip {json_path}: not found")
+            continue
+        _, matrix, normed = load_embeddings(json_path, name_key, lower)
+        if normed is None:
+            normed = normalize_rows(matrix).astype(np.float32)
+
+        start = time.perf_counter()
+
+        def on_progress(done, total):
+            elapsed = time.perf_counter() - start
+            print(f"\r{file_name}: {done:,}/{total:,} rows, {elapsed:.0f}s, "
+                  f"ETA {elapsed / done * (total - done):.0f}s", end="", file=sys.stderr)
+
+        graph = KnnGraph.build(normed, k, workers, on_progress)
+        print(file=sys.stderr)
+        graph.save(json_path)
+        print(f"{file_name}: {len(graph):,} rows x {graph.k} neighbours in {time.perf_counter() - start:.1f}s "
+              f"-> {paths['indices'].name} ({graph.nbytes / 1e6:.1f} MB)")
+
+        # Kiểm tra một mẫu hàng với tìm kiếm trực tiếp
+        engine = SimilarityEngine(normed, normed)
+        rng = np.random.default_rng(0)
+        sample = rng.choice(len(graph), min(200, len(graph)), replace=False)
+        hits = sum(len(np.intersect1d(graph.neighbors(r, graph.k)[0], engine.query_row(r, graph.k)[0])) for r in sample)
+        print(f"  recall@{graph.k} vs live search on {len(sample)} rows: {hits / max(1, len(sample) * graph.k):.4f}")
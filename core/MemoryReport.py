@@ -0,0 +1,76 @@
+import mmap
+import sys
+
+import numpy as np
+
+
+def _mapped(array):
+    """True nếu dữ liệu của mảng nằm trên file mmap (thuộc page cache, không phải heap của process)"""
+    base = array
+    while base is not None:
+        if isinstance(base, (np.memmap, mmap.mmap)):
+            return True
+        base = getattr(base, "base", None)
+    return False
+
+
+def measure(obj, seen=None):
+    """Trả về (heap_bytes, mapped_bytes) của obj và mọi thứ nó tham chiếu
+
+    Mỗi object chỉ được tính một lần theo `seen`, nên khi đo nhiều cấu trúc với cùng một `seen`,
+    phần dùng chung (vd. view của cùng một ma trận, chuỗi tên) chỉ tính cho cấu trúc đầu tiên.
+    Dữ liệu của view được tính cho mảng gốc, không tính cho view.
+    """
+    if seen is None:
+        seen = set()
+    heap = mapped = 0
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if item is None or id(item) in seen:
+            continue
+        seen.add(id(item))
+
+        if isinstance(item, np.ndarray):
+            heap += sys.getsizeof(item) - (item.nbytes if item.flags.owndata else 0)
+            if _mapped(item):
+                root = item
+                while isinstance(root.base, np.ndarray):
+                    root = root.base
+                if id(root.base) not in seen:
+                    seen.add(id(root.base))
+                    mapped += root.nbytes
+            elif item.flags.owndata:
+                heap += item.nbytes
+            elif isinstance(item.base, np.ndarray):
+                stack.append(item.base)
+            continue
+
+        heap += sys.getsizeof(item)
+        if isinstance(item, (str, bytes, int, float, bool)):
+            continue
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+        elif hasattr(item, "__dict__"):
+            stack.extend(vars(item).values())
+    return heap, mapped
+
+
+def memory_report(structures):
+    """Đo theo thứ tự một dict {tên: object}: trả về list (tên, heap_bytes, mapped_bytes)"""
+    seen = set()
+    return [(name, *measure(obj, seen)) for name, obj in structures.items()]
+
+
+def format_report(rows):
+    width = max([len(name) for name, _, _ in rows] + [9])
+    lines = [f"{'Structure':<{width}}  {'Heap MB':>10}  {'Mapped MB':>10}"]
+    for name, heap, mapped in rows:
+        lines.append(f"{name:<{width}}  {heap / 1e6:10.2f}  {mapped / 1e6:10.2f}")
+    heap_total = sum(row[1] for row in rows)
+    mapped_total = sum(row[2] for row in rows)
+    lines.append(f"{'Total':<{width}}  {heap_total / 1e6:10.2f}  {mapped_total / 1e6:10.2f}")
+    return "\n".join(lines)
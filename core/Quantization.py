@@ -0,0 +1,168 @@
+import os
+import sys
+import time
+import numpy as np
+from pathlib import Path
+
+# float64: như bản gốc, float32: mặc định, int8: quét thô bằng ma trận int8 rồi xếp hạng lại bằng float32
+PRECISIONS = ("float64", "float32", "int8")
+
+
+class Int8Matrix:
+    """Lượng tử hoá int8 đối xứng theo từng hàng: row ≈ codes[row] * scales[row]
+
+    Chiếm 1/4 bộ nhớ của float32. Dùng để quét thô toàn bộ ma trận, sau đó RERANK·k ứng viên
+    tốt nhất được tính lại chính xác trên ma trận float32 (có thể là mmap, chỉ các hàng ứng viên bị đọc).
+    """
+
+    CHUNK_ROWS = 65536
+    # Số hàng giải nén mỗi lần khi quét, đủ nhỏ để buffer float32 nằm trong cache
+    SCAN_ROWS = 2048
+    # Số ứng viên giữ lại sau lượt quét int8 = RERANK * k
+    RERANK = 4
+
+    def __init__(self, codes, scales):
+        self.codes = codes
+        self.scales = scales
+
+    def __len__(self):
+        return self.codes.shape[0]
+
+    @property
+    def nbytes(self):
+        return self.codes.nbytes + self.scales.nbytes
+
+    @classmethod
+    def from_matrix(cls, matrix):
+        """Lượng tử hoá theo từng chunk, không tạo bản sao float toàn bộ ma trận"""
+        n, d = matrix.shape
+        codes = np.empty((n, d), dtype=np.int8)
+        scales = np.empty(n, dtype=np.float32)
+        for start in range(0, n, cls.CHUNK_ROWS):
+            chunk = np.asarray(matrix[start:start + cls.CHUNK_ROWS], dtype=np.float32)
+            scale = np.abs(chunk).max(axis=1) / 127
+            scale[scale == 0] = 1.0
+            codes[start:start + len(chunk)] = np.rint(chunk / scale[:, None])
+            scales[start:start + len(chunk)] = scale
+        return cls(codes, scales)
+
+    def scores(self, q):
+        """Điểm xấp xỉ codes·q·scale cho mọi hàng
+
+        Giải nén từng khối nhỏ sang một buffer float32 dùng lại (vừa cache CPU) rồi nhân với q,
+        nên chỉ đọc 1 byte/phần tử từ RAM thay vì 4.
+        """
+        q = np.asarray(q, dtype=np.float32)
+        out = np.empty(len(self), dtype=np.float32)
+        buffer = np.empty((self.SCAN_ROWS, self.codes.shape[1]), dtype=np.float32)
+        for start in range(0, len(self), self.SCAN_ROWS):
+            chunk = self.codes[start:start + self.SCAN_ROWS]
+            block = buffer[:len(chunk)]
+            np.copyto(block, chunk, casting="unsafe")
+            np.dot(block, q, out=out[start:start + len(chunk)])
+        out *= self.scales
+        return out
+
+    def search(self, normed, q, k, exclude=None):
+        """Top-k: quét int8 lấy RERANK·k ứng viên rồi xếp hạng lại bằng normed (q phải đã chuẩn hoá L2)"""
+        scores = self.scores(q)
+        if exclude is not None:
+            scores[exclude] = -np.inf
+        n_valid = len(scores) - (np.size(exclude) if exclude is not None else 0)
+        k = min(k, n_valid)
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=normed.dtype)
+
+        n_cand = min(self.RERANK * k, n_valid)
+        cand = np.sort(np.argpartition(-scores, n_cand - 1)[:n_cand])
+        exact = np.asarray(normed[cand]) @ q.astype(normed.dtype)
+        top = np.argpartition(-exact, k - 1)[:k]
+        top = top[np.argsort(-exact[top], kind="stable")]
+        return cand[top], exact[top]
+
+    def save(self, json_path):
+        paths = quantized_paths(json_path)
+        np.save(paths["codes"], self.codes)
+        np.save(paths["scales"], self.scales)
+
+    @classmethod
+    def load(cls, json_path, mmap=True):
+        paths = quantized_paths(json_path)
+        mode = "r" if mmap else None
+        return cls(np.load(paths["codes"], mmap_mode=mode), np.load(paths["scales"], mmap_mode=mode))
+
+
+def quantized_paths(json_path):
+    """File int8 nằm cạnh file embedding, vd. doc_embeddings.int8.npy + doc_embeddings.scales.npy"""
+    json_path = Path(json_path)
+    return {
+        "codes": json_path.with_name(json_path.stem + ".int8.npy"),
+        "scales": json_path.with_name(json_path.stem + ".scales.npy"),
+    }
+
+
+def load_quantized(json_path, normed=None):
+    """Mở bản int8 đã lưu nếu có, không cũ hơn dữ liệu và cùng shape với normed; nếu không,
+    lượng tử hoá lại normed (nếu có)
+    """
+    paths = quantized_paths(json_path)
+    json_path = Path(json_path)
+    if all(p.exists() for p in paths.values()):
+        if not json_path.exists() or all(p.stat().st_mtime >= json_path.stat().st_mtime for p in paths.values()):
+            stored = Int8Matrix.load(json_path)
+            # Bản int8 của một ma trận khác sẽ xếp hạng lại nhầm hàng của normed
+            if stored.scales.shape[0] == stored.codes.shape[0] and (
+                normed is None or stored.codes.shape == normed.shape
+            ):
+                return stored
+    if normed is None:
+        return None
+    return Int8Matrix.from_matrix(normed)
+
+
+if __name__ == "__main__":
+    # python -m core.Quantization [thư mục dữ liệu] [số truy vấn]
+    from core.EmbeddingStore import load_embeddings
+    from core.SimilarityEngine import SimilarityEngine, normalize_rows
+
+    base_path = Path(sys.argv[1] if len(sys.argv) > 1 else os.getcwd())
+    n_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    json_path = base_path / "doc_embeddings.json"
+    k = 20
+
+    _, mU, normed = load_embeddings(json_path, "title", lower=True)
+    normed64 = normalize_rows(np.asarray(mU, dtype=np.float64))
+    normed32 = normed64.astype(np.float32) if normed is None else np.asarray(normed)
+
+    start = time.perf_counter()
+    quantized = Int8Matrix.from_matrix(normed32)
+    print(f"Quantized {len(quantized):,} x {normed32.shape[1]} in {time.perf_counter() - start:.1f}s")
+    quantized.save(json_path)
+
+    rng = np.random.default_rng(0)
+    rows = rng.choice(len(normed64), min(n_queries, len(normed64)), replace=False)
+
+    modes = {
+        "float64": (SimilarityEngine(normed64, normed64), normed64.nbytes),
+        "float32": (SimilarityEngine(normed32, normed32), normed32.nbytes),
+        "int8": (SimilarityEngine(normed32, normed32, quantized=quantized), quantized.nbytes),
+    }
+    truth = {}
+    for name, (engine, nbytes) in modes.items():
+        hits = 0
+        max_err = 0.0
+        start = time.perf_counter()
+        results = [engine.query_row(int(row), k) for row in rows]
+        elapsed = time.perf_counter() - start
+        for row, (indices, scores) in zip(rows, results):
+            if name == "float64":
+                truth[row] = (indices, scores)
+                continue
+            hits += len(np.intersect1d(indices, truth[row][0]))
+            exact = normed64[indices] @ normed64[row]
+            max_err = max(max_err, float(np.abs(scores.astype(np.float64) - exact).max()))
+        recall = 1.0 if name == "float64" else hits / (len(rows) * k)
+        print(
+            f"{name:8s} {nbytes / 1e6:9.1f} MB scanned  {len(rows) / elapsed:8.1f} q/s  "
+            f"recall@{k}={recall:.4f}  max |score error|={max_err:.2e}"
+        )
@@ -0,0 +1,83 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+class QueryCache:
+    """LRU cache kết quả top-k (indices, scores), giới hạn theo tổng số byte của các mảng
+
+    Key do SimilarityEngine tạo: (tên ma trận, loại truy vấn, row hoặc hash vector, k, n_probe).
+    Dùng chung cho mọi màn hình và an toàn khi gọi từ nhiều worker thread.
+    """
+
+    # Chi phí ước lượng cho mỗi entry ngoài dữ liệu mảng (key, tuple, OrderedDict node)
+    ENTRY_OVERHEAD = 256
+
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    @staticmethod
+    def vector_key(vector):
+        """Hash nội dung vector truy vấn (dtype + dữ liệu)"""
+        vector = np.ascontiguousarray(vector)
+        h = hashlib.blake2b(str(vector.dtype).encode(), digest_size=16)
+        h.update(vector.data)
+        return h.hexdigest()
+
+    def get(self, key):
+        with self.lock:
+            value = self.entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, indices, scores):
+        # Kết quả được dùng chung giữa các lần gọi nên khoá không cho ghi
+        indices.setflags(write=False)
+        scores.setflags(write=False)
+        size = indices.nbytes + scores.nbytes + self.ENTRY_OVERHEAD
+        if size > self.max_bytes:
+            return
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.nbytes -= old[2]
+            self.entries[key] = (indices, scores, size)
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                _, (_, _, evicted) = self.entries.popitem(last=False)
+                self.nbytes -= evicted
+
+    def clear(self, name=None):
+        """Xoá mọi entry, hoặc chỉ các entry của ma trận `name` (vd. khi embedding được load lại)"""
+        with self.lock:
+            if name is None:
+                self.entries.clear()
+                self.nbytes = 0
+                return
+            for key in [key for key in self.entries if key[0] == name]:
+                self.nbytes -= self.entries.pop(key)[2]
+
+    def stats(self):
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "bytes": self.nbytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
@@ -0,0 +1,33 @@
+import numpy as np
+
+
+class QueryFolder:
+    """Fold một truy vấn nhiều term vào không gian LSA của tài liệu
+
+    Hàng của mV là V·Σ, hàng của mU là U·Σ. Với vector tần suất term d của truy vấn,
+    d^T·V = (Σ_t tf_t · mV[t]) · Σ^-1 so sánh được trực tiếp với các hàng của mU.
+    """
+
+    def __init__(self, vocabulary, mV, singular_values=None):
+        self.vocabulary = vocabulary
+        self.mV = mV
+        inv_sigma = np.ones(mV.shape[1], dtype=mV.dtype)
+        if singular_values is not None and len(singular_values) == mV.shape[1]:
+            sigma = np.asarray(singular_values, dtype=np.float64)
+            inv_sigma = np.where(sigma > 0, 1.0 / np.where(sigma > 0, sigma, 1.0), 0.0).astype(mV.dtype)
+        self.inv_sigma = inv_sigma
+
+    @classmethod
+    def from_topics(cls, vocabulary, mV, topic_data):
+        """Lấy singular value theo thứ tự topic id từ topics.json"""
+        topics = sorted(topic_data, key=lambda t: t["topic"])
+        return cls(vocabulary, mV, [t["singular_value"] for t in topics])
+
+    def fold(self, tokens):
+        """Trả về (vector, unknown); vector là None nếu không token nào có trong từ điển"""
+        rows, unknown = self.vocabulary.lookup(tokens)
+        if not rows:
+            return None, unknown
+        rows, tf = np.unique(rows, return_counts=True)
+        vector = (tf.astype(self.mV.dtype) @ np.asarray(self.mV[rows])) * self.inv_sigma
+        return vector, unknown
@@ -0,0 +1,52 @@
+import os
+import json
+import hashlib
+import numpy as np
+from pathlib import Path
+
+
+def fingerprint(X, chunk_rows=65536):
+    """Hash nội dung ma trận (shape, dtype, dữ liệu) theo từng chunk, dùng được với mmap"""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr((X.shape, str(X.dtype))).encode())
+    for start in range(0, X.shape[0], chunk_rows):
+        h.update(np.ascontiguousarray(X[start:start + chunk_rows]).data)
+    return h.hexdigest()
+
+
+class ResultCache:
+    """Cache kết quả tính toán (silhouette, KMeans, PCA) trên đĩa dưới dạng .npz
+
+    Mỗi entry được xác định bởi loại kết quả + fingerprint dữ liệu + tham số tính toán,
+    nên dữ liệu hoặc tham số đổi thì chỉ phần bị ảnh hưởng phải tính lại.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = Path(directory) if directory else Path(os.getcwd()) / ".cache" / "plot"
+
+    @staticmethod
+    def key(fp, **params):
+        payload = json.dumps(params, sort_keys=True, default=str)
+        return hashlib.blake2b(f"{fp}|{payload}".encode(), digest_size=16).hexdigest()
+
+    def _path(self, kind, key):
+        return self.directory / f"{kind}-{key}.npz"
+
+    def load(self, kind, key):
+        """Trả về dict các mảng đã lưu, None nếu chưa có hoặc file hỏng"""
+        path = self._path(kind, key)
+        if not path.exists():
+            return None
+        try:
+            with np.load(path) as data:
+                return {name: data[name] for name in data.files}
+        except (OSError, ValueError):
+            return None
+
+    def save(self, kind, key, **arrays):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(kind, key)
+        # Ghi ra file tạm rồi đổi tên để các instance chạy song song không đọc phải file dở dang
+        tmp = path.with_name(f"{path.stem}.{os.getpid()}.tmp.npz")
+        np.savez(tmp, **arrays)
+        os.replace(tmp, path)
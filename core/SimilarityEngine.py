@@ -0,0 +1,138 @@
+import numpy as np
+
+from core.QueryCache import QueryCache
+
+
+def normalize_rows(matrix):
+    """Chuẩn hoá L2 từng hàng, hàng toàn 0 giữ nguyên"""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class SimilarityEngine:
+    """Cosine top-k search trên các hàng của một ma trận embedding"""
+
+    # Giới hạn số phần tử của ma trận điểm tạm trong query_many (~64MB float32)
+    BATCH_CELLS = 16_000_000
+
+    def __init__(self, matrix, normed=None, ann=None, cache=None, name="matrix", quantized=None, knn=None):
+        self.matrix = matrix
+        # normed có thể là bản đã chuẩn hoá sẵn (vd. mmap từ EmbeddingStore)
+        self.normed = normalize_rows(matrix) if normed is None else normed
+        # Index ANN tuỳ chọn (core.AnnIndex.IVFIndex), chỉ dùng khi n_probe > 0
+        self.ann = ann
+        # Bản int8 tuỳ chọn (core.Quantization.Int8Matrix) của normed: quét thô rồi xếp hạng lại bằng normed
+        self.quantized = quantized
+        # Graph top-k dựng sẵn tuỳ chọn (core.KnnGraph.KnnGraph): query_row đọc thẳng hàng tương ứng
+        self.knn = knn
+        # Cache LRU tuỳ chọn (core.QueryCache.QueryCache), có thể dùng chung giữa nhiều engine;
+        # name phân biệt entry của từng ma trận
+        self.cache = cache
+        self.name = name
+
+    def __len__(self):
+        return self.matrix.shape[0]
+
+    def _cached(self, key, compute):
+        if self.cache is None:
+            return compute()
+        key = (self.name,) + key
+        hit = self.cache.get(key)
+        if hit is not None:
+            return hit[0], hit[1]
+        indices, scores = compute()
+        self.cache.put(key, indices, scores)
+        return indices, scores
+
+    def query(self, vector, k=20, exclude=None, n_probe=0):
+        """Trả về (indices, scores) của k hàng gần vector nhất, giảm dần theo score"""
+        if self.cache is None:
+            return self._query(vector, k, exclude, n_probe)
+        excluded = None if exclude is None else tuple(np.atleast_1d(exclude).tolist())
+        key = ("vector", QueryCache.vector_key(vector), k, excluded, n_probe)
+        return self._cached(key, lambda: self._query(vector, k, exclude, n_probe))
+
+    def _query(self, vector, k, exclude, n_probe):
+        q = np.asarray(vector, dtype=self.normed.dtype)
+        nq = np.linalg.norm(q)
+        if nq == 0:
+            q = np.zeros_like(q)
+        else:
+            q = q / nq
+        if self.ann is not None and n_probe > 0:
+            return self.ann.search(self.normed, q, k, n_probe, exclude)
+        if self.quantized is not None:
+            return self.quantized.search(self.normed, q, k, exclude)
+        scores = self.normed @ q
+        return self._top_k(scores, k, exclude)
+
+    def query_row(self, index, k=20, n_probe=0):
+        """Top-k hàng giống hàng `index` nhất (bỏ qua chính nó)"""
+        if self.knn is not None:
+            hit = self.knn.neighbors(index, k)
+            if hit is not None:
+                return hit
+        return self._cached(("row", int(index), k, n_probe), lambda: self._query_row(index, k, n_probe))
+
+    def _query_row(self, index, k, n_probe):
+        q = np.asarray(self.normed[index])
+        if self.ann is not None and n_probe > 0:
+            return self.ann.search(self.normed, q, k, n_probe, exclude=index)
+        if self.quantized is not None:
+            return self.quantized.search(self.normed, q, k, exclude=index)
+        scores = self.normed @ q
+        return self._top_k(scores, k, exclude=index)
+
+    def query_rows(self, rows, k=20, n_probe=0):
+        """Top-k theo tâm (trung bình đã chuẩn hoá) của nhiều hàng, bỏ qua chính các hàng đó"""
+        rows = np.unique(rows)
+        if len(rows) == 1:
+            return self.query_row(rows[0], k, n_probe)
+        return self._cached(("rows", tuple(rows.tolist()), k, n_probe), lambda: self._query_rows(rows, k, n_probe))
+
+    def _query_rows(self, rows, k, n_probe):
+        centroid = np.asarray(self.normed[rows]).sum(axis=0)
+        return self._query(centroid, k, rows, n_probe)
+
+    def query_many(self, Q, k=20, exclude=None):
+        """Top-k cho nhiều vector truy vấn cùng lúc, trả về hai mảng (m, k)
+
+        exclude (tuỳ chọn) là list gồm m mảng row bị loại cho từng truy vấn; nếu còn ít hơn k hàng hợp lệ,
+        các vị trí cuối có score -inf.
+        """
+        Q = np.atleast_2d(np.asarray(Q, dtype=self.normed.dtype))
+        Q = normalize_rows(Q)
+        n = len(self)
+        k = min(k, n)
+        indices = np.empty((Q.shape[0], k), dtype=np.int64)
+        scores = np.empty((Q.shape[0], k), dtype=self.normed.dtype)
+        if k <= 0:
+            return indices, scores
+
+        step = max(1, self.BATCH_CELLS // max(n, 1))
+        for start in range(0, Q.shape[0], step):
+            block = Q[start:start + step] @ self.normed.T
+            if exclude is not None:
+                for i, rows in enumerate(exclude[start:start + step]):
+                    block[i, rows] = -np.inf
+            idx = np.argpartition(-block, k - 1, axis=1)[:, :k]
+            part = np.take_along_axis(block, idx, axis=1)
+            order = np.argsort(-part, axis=1, kind="stable")
+            indices[start:start + step] = np.take_along_axis(idx, order, axis=1)
+            scores[start:start + step] = np.take_along_axis(part, order, axis=1)
+        return indices, scores
+
+    @staticmethod
+    def _top_k(scores, k, exclude=None):
+        if exclude is not None:
+            scores[exclude] = -np.inf
+            k = min(k, scores.shape[0] - np.size(exclude))
+        else:
+            k = min(k, scores.shape[0])
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=scores.dtype)
+
+        idx = np.argpartition(-scores, k - 1)[:k]
+        idx = idx[np.argsort(-scores[idx], kind="stable")]
+        return idx, scores[idx]
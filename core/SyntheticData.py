@@ -0,0 +1,130 @@
+import sys
+import json
+import time
+import argparse
+import numpy as np
+from pathlib import Path
+
+from core.DataLoader import TOPICS_FILE, TERMS_FILE, DOCS_FILE
+
+# Âm tiết để ghép thành term giả, term thứ i là biểu diễn của i theo cơ số len(SYLLABLES)
+SYLLABLES = [c + v for c in "bdfghklmnprstvz" for v in "aeiou"]
+# Số cụm tiềm ẩn của dữ liệu, để phân cụm / silhouette có cấu trúc thật để tìm
+N_CLUSTERS = 50
+CHUNK_ROWS = 50_000
+
+
+def parse_count(text):
+    """'10k' -> 10_000, '2.5M' -> 2_500_000"""
+    text = str(text).strip().lower()
+    scale = {"k": 1_000, "m": 1_000_000}.get(text[-1:], 1)
+    return int(float(text.rstrip("km")) * scale)
+
+
+def make_terms(n):
+    """n term khác nhau, ngắn, chỉ gồm chữ thường"""
+    base = len(SYLLABLES)
+    terms = []
+    for i in range(n):
+        parts = []
+        value = i + base
+        while value:
+            value, digit = divmod(value, base)
+            parts.append(SYLLABLES[digit])
+        terms.append("".join(reversed(parts)))
+    return terms
+
+
+def singular_values(dim):
+    """Singular value giảm dần như phổ của LSA thật"""
+    return 15000.0 * np.arange(1, dim + 1) ** -0.7
+
+
+class EmbeddingSampler:
+    """Sinh hàng embedding dạng U·Σ: tâm cụm + nhiễu, mỗi cột nhân với singular value tương ứng"""
+
+    def __init__(self, dim, seed):
+        self.rng = np.random.default_rng(seed)
+        self.centers = self.rng.standard_normal((N_CLUSTERS, dim))
+        sigma = singular_values(dim)
+        self.scale = sigma / sigma[0] * 50.0
+
+    def sample(self, n):
+        labels = self.rng.integers(0, N_CLUSTERS, n)
+        rows = self.centers[labels] + 0.6 * self.rng.standard_normal((n, len(self.scale)))
+        return rows * self.scale
+
+
+def write_embeddings(path, name_key, names, sampler, progress=None):
+    """Ghi file JSON-lines {name_key, "embedding"} đúng định dạng của các file gốc"""
+    dim = len(sampler.scale)
+    fmt = ",".join(["%.6g"] * dim)
+    prefix = '{"' + name_key + '":'
+    with open(path, "w", encoding="utf-8") as outfile:
+        for start in range(0, len(names), CHUNK_ROWS):
+            chunk = sampler.sample(min(CHUNK_ROWS, len(names) - start))
+            outfile.write("".join(
+                f'{prefix}{json.dumps(name, ensure_ascii=False)},"embedding":[{fmt % tuple(row)}]}}\n'
+                for name, row in zip(names[start:start + CHUNK_ROWS], chunk.tolist())
+            ))
+            if progress:
+                progress(path.name, start + len(chunk), len(names))
+
+
+def write_topics(path, terms, dim, rng, top_terms=20):
+    sigma = singular_values(dim)
+    with open(path, "w", encoding="utf-8") as outfile:
+        for topic in range(dim):
+            picked = rng.choice(len(terms), min(top_terms, len(terms)), replace=False)
+            weights = np.sort(rng.standard_normal(len(picked)) * 0.3)[::-1]
+            outfile.write(json.dumps({
+                "topic": topic,
+                "singular_value": float(sigma[topic]),
+                "terms": [terms[i] for i in picked],
+                "weights": weights.tolist(),
+            }) + "\n")
+
+
+def generate(out_dir, n_docs, n_terms, dim, seed=0, progress=None):
+    """Ghi topics.json, term_embeddings.json, doc_embeddings.json vào out_dir
+
+    Tiêu đề tài liệu gồm 2-4 term ngẫu nhiên và số thứ tự nên luôn khác nhau.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    terms = make_terms(n_terms)
+    write_topics(out_dir / TOPICS_FILE, terms, dim, rng)
+    write_embeddings(out_dir / TERMS_FILE, "term", terms, EmbeddingSampler(dim, seed + 1), progress)
+
+    words = rng.integers(0, n_terms, (n_docs, 4))
+    lengths = rng.integers(2, 5, n_docs)
+    titles = [
+        " ".join([terms[w] for w in words[i, :lengths[i]]] + [str(i)]).title()
+        for i in range(n_docs)
+    ]
+    write_embeddings(out_dir / DOCS_FILE, "title", titles, EmbeddingSampler(dim, seed + 2), progress)
+
+
+if __name__ == "__main__":
+    # python -m core.SyntheticData <thư mục> --docs 1M --terms 100k --dim 100
+    parser = argparse.ArgumentParser(description="Write synthetic topics/term/doc embedding files.")
+    parser.add_argument("out_dir")
+    parser.add_argument("--docs", default="10k", help="number of documents, e.g. 10k, 1M")
+    parser.add_argument("--terms", default=None, help="number of terms (default: docs / 10, at least 1k)")
+    parser.add_argument("--dim", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    n_docs = parse_count(args.docs)
+    n_terms = parse_count(args.terms) if args.terms else max(1000, n_docs // 10)
+    start = time.perf_counter()
+
+    def on_progress(name, rows, total):
+        print(f"\r{name}: {rows:,}/{total:,}", end="", file=sys.stderr)
+        if rows == total:
+            print(file=sys.stderr)
+
+    generate(args.out_dir, n_docs, n_terms, args.dim, args.seed, on_progress)
+    print(f"Wrote {n_terms:,} terms and {n_docs:,} docs x {args.dim} to {args.out_dir} "
+          f"in {time.perf_counter() - start:.1f}s")
@@ -0,0 +1,105 @@
+from array import array
+from bisect import bisect_left
+
+import numpy as np
+
+
+class TitleIndex:
+    """Index tiêu đề tài liệu: inverted index trigram cho tìm chuỗi con
+
+    Thêm danh sách tiêu đề đã sắp xếp (khớp chính xác / tiền tố = một đoạn liên tiếp, tìm bằng bisect)
+    và hạng theo độ dài, để xếp hạng kết quả bằng numpy thay vì gọi hàm key Python cho từng row.
+    """
+
+    GRAM = 3
+
+    def __init__(self, titles):
+        self.titles = titles
+
+        grams = {}
+        pair_gram = array("i")
+        pair_row = array("i")
+        for row, title in enumerate(titles):
+            for gram in self._grams(title):
+                pair_gram.append(grams.setdefault(gram, len(grams)))
+                pair_row.append(row)
+        self.grams = grams
+
+        # Postings dạng CSR: các row của trigram g nằm trong postings[offsets[g]:offsets[g + 1]]
+        pair_gram = np.frombuffer(pair_gram, dtype=np.int32)
+        order = np.argsort(pair_gram, kind="stable")
+        self.postings = np.frombuffer(pair_row, dtype=np.int32)[order]
+        self.offsets = np.zeros(len(grams) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(pair_gram, minlength=len(grams)), out=self.offsets[1:])
+
+        self.sorted_rows = np.array(sorted(range(len(titles)), key=titles.__getitem__), dtype=np.int32)
+        self.sorted_titles = [titles[row] for row in self.sorted_rows]
+        # Hạng của mỗi row khi xếp theo (độ dài tiêu đề, row)
+        lengths = np.fromiter((len(title) for title in titles), dtype=np.int64, count=len(titles))
+        self.length_rank = np.empty(len(titles), dtype=np.int64)
+        self.length_rank[np.argsort(lengths, kind="stable")] = np.arange(len(titles))
+
+    @classmethod
+    def _grams(cls, text):
+        return {text[i:i + cls.GRAM] for i in range(len(text) - cls.GRAM + 1)}
+
+    def candidates(self, text, within=None):
+        """Các row (đã sắp xếp) chứa mọi trigram của text, cần kiểm tra lại bằng `in`
+
+        `within` là kết quả của một truy vấn có text chứa nó (vd. vừa gõ thêm ký tự): tập kết quả
+        mới nằm trong đó, nên có thể bắt đầu giao từ tập này nếu nó nhỏ hơn.
+        """
+        lists = []
+        for gram in self._grams(text):
+            gid = self.grams.get(gram)
+            if gid is None:
+                return np.empty(0, dtype=np.int32)
+            lists.append(self.postings[self.offsets[gid]:self.offsets[gid + 1]])
+        if not lists:
+            return np.arange(len(self.titles), dtype=np.int32) if within is None else within
+        lists.sort(key=len)
+        if within is not None and len(within) < len(lists[0]):
+            lists.insert(0, within)
+        result = lists[0]
+        # Giao bằng bảng bool theo row: O(độ dài posting) thay vì sắp xếp như intersect1d
+        mask = np.zeros(len(self.titles), dtype=bool)
+        for posting in lists[1:]:
+            if len(result) == 0:
+                break
+            mask[posting] = True
+            result = result[mask[result]]
+            mask[posting] = False
+        return result
+
+    def matches(self, text, within=None):
+        """Mọi row chứa text (mảng đã sắp xếp)"""
+        pool = self.candidates(text, within)
+        if len(text) == self.GRAM:
+            # Truy vấn đúng một trigram: postings đã là kết quả chính xác
+            return pool
+        titles = self.titles
+        return np.fromiter((row for row in pool.tolist() if text in titles[row]), dtype=np.int32)
+
+    def rank(self, text, matches, limit=50):
+        """Tối đa `limit` row của matches, xếp hạng khớp chính xác > tiền tố > tiêu đề ngắn > row"""
+        n = len(self.titles)
+        lo = bisect_left(self.sorted_titles, text)
+        hi = bisect_left(self.sorted_titles, text + "\U0010ffff", lo)
+        exact = lo
+        while exact < hi and self.sorted_titles[exact] == text:
+            exact += 1
+
+        key = self.length_rank[matches] + 2 * n
+        key[np.isin(matches, self.sorted_rows[lo:hi])] -= n
+        key[np.isin(matches, self.sorted_rows[lo:exact])] -= n
+        if limit is not None and len(matches) > limit:
+            top = np.argpartition(key, limit - 1)[:limit]
+        else:
+            top = np.arange(len(matches))
+        top = top[np.argsort(key[top], kind="stable")]
+        return [int(row) for row in matches[top]]
+
+    def search(self, text, limit=50, within=None):
+        """Trả về (rows, matches): tối đa `limit` row đã xếp hạng và toàn bộ row chứa text"""
+        matches = self.matches(text, within)
+        return self.rank(text, matches, limit), matches
@@ -0,0 +1,46 @@
+from collections.abc import Mapping
+
+
+class Vocabulary:
+    """Từ điển term <-> row id của ma trận V, dùng chung cho các màn hình tìm theo term"""
+
+    def __init__(self, terms):
+        self.terms = terms
+        self.rows = {}
+        for row, term in enumerate(terms):
+            self.rows.setdefault(term, row)
+
+    def __len__(self):
+        return len(self.terms)
+
+    def __contains__(self, term):
+        return term in self.rows
+
+    def lookup(self, tokens):
+        """Tra toàn bộ token một lượt: trả về (rows, unknown) theo thứ tự xuất hiện"""
+        rows = []
+        unknown = []
+        for token in tokens:
+            row = self.rows.get(token)
+            if row is None:
+                unknown.append(token)
+            else:
+                rows.append(row)
+        return rows, unknown
+
+
+class TermVectors(Mapping):
+    """term -> hàng tương ứng của ma trận, view được tạo khi truy cập nên không giữ sẵn object nào cho từng term"""
+
+    def __init__(self, vocabulary, matrix):
+        self.vocabulary = vocabulary
+        self.matrix = matrix
+
+    def __getitem__(self, term):
+        return self.matrix[self.vocabulary.rows[term]]
+
+    def __iter__(self):
+        return iter(self.vocabulary.rows)
+
+    def __len__(self):
+        return len(self.vocabulary.rows)
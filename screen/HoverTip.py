@@ -0,0 +1,97 @@
+import time
+from PyQt6.QtWidgets import QLabel
+from PyQt6.QtCore import QTimer
+
+
+class HoverTip:
+    """Tooltip khi rê chuột trên một axes của matplotlib
+
+    hit_test(event) trả về (text, (x, y)) hoặc None; (x, y) là toạ độ dữ liệu của phần tử được chọn
+    để tô sáng, None nếu không cần. Sự kiện chuột được gom lại, tối đa một lần xử lý mỗi interval_ms,
+    và điểm tô sáng được vẽ bằng blit nên rê chuột không kéo theo vẽ lại cả figure.
+    """
+
+    def __init__(self, ax, hit_test, interval_ms=16):
+        self.ax = ax
+        self.canvas = ax.figure.canvas
+        self.hit_test = hit_test
+        self.interval_ms = interval_ms
+        self.pending = None
+        self.last = 0.0
+        self.background = None
+
+        self.tooltip = QLabel(self.canvas)
+        self.tooltip.setStyleSheet("""
+            QLabel {
+                background-color: rgba(40, 40, 40, 220);
+                color: white;
+                border-radius: 4px;
+                padding: 3px 6px;
+                font-size: 11px;
+            }
+        """)
+        self.tooltip.hide()
+
+        # Marker tô sáng là artist animated: không nằm trong lần vẽ thường, chỉ vẽ qua blit
+        self.marker, = ax.plot(
+            [], [], "o", markersize=10, markerfacecolor="none",
+            markeredgecolor="black", markeredgewidth=2, animated=True,
+        )
+
+        self.timer = QTimer(self.canvas)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.flush)
+
+        self.canvas.mpl_connect("draw_event", self.on_draw)
+        self.canvas.mpl_connect("motion_notify_event", self.on_motion)
+        self.canvas.mpl_connect("figure_leave_event", lambda event: self.hide())
+
+    def on_draw(self, event):
+        # Lưu nền của axes sau mỗi lần vẽ đầy đủ để blit marker lên trên
+        self.background = self.canvas.copy_from_bbox(self.ax.bbox)
+        self.marker.set_visible(False)
+
+    def on_motion(self, event):
+        self.pending = event
+        wait = self.interval_ms - (time.perf_counter() - self.last) * 1000
+        if wait <= 0:
+            self.flush()
+        elif not self.timer.isActive():
+            self.timer.start(int(wait) + 1)
+
+    def flush(self):
+        event, self.pending = self.pending, None
+        if event is None:
+            return
+        self.last = time.perf_counter()
+
+        hit = self.hit_test(event) if event.inaxes == self.ax and event.guiEvent else None
+        if hit is None:
+            self.hide()
+            return
+
+        text, xy = hit
+        pos = event.guiEvent.position()
+        self.tooltip.setText(text)
+        self.tooltip.adjustSize()
+        self.tooltip.move(int(pos.x()) + 12, int(pos.y()) - 25)
+        self.tooltip.show()
+        if xy is not None or self.marker.get_visible():
+            self.blit_marker(xy)
+
+    def hide(self):
+        self.tooltip.hide()
+        if self.marker.get_visible():
+            self.blit_marker(None)
+
+    def blit_marker(self, xy):
+        if self.background is None:
+            return
+        self.canvas.restore_region(self.background)
+        if xy is not None:
+            self.marker.set_data([xy[0]], [xy[1]])
+            self.marker.set_visible(True)
+            self.ax.draw_artist(self.marker)
+        else:
+            self.marker.set_visible(False)
+        self.canvas.blit(self.ax.bbox)
@@ -0,0 +1,163 @@
+import numpy as np
+from scipy.spatial import cKDTree
+from matplotlib.colors import to_rgba
+
+
+class LODScatter:
+    """Scatter nhiều mức chi tiết theo số điểm nằm trong vùng đang nhìn
+
+    - Quá nhiều điểm: ảnh mật độ (histogram 2D), mỗi ô tô màu theo cụm chiếm đa số
+    - Vừa phải: mẫu phân tầng theo cụm, tối đa MAX_POINTS điểm
+    - Ít hơn MAX_POINTS: vẽ toàn bộ điểm
+
+    Cập nhật lại mỗi khi giới hạn trục đổi (zoom/pan), nên chi phí vẽ không phụ thuộc kích thước dữ liệu.
+    """
+
+    MAX_POINTS = 5000
+    # Trên ngưỡng này chuyển sang ảnh mật độ thay vì mẫu điểm
+    DENSITY_THRESHOLD = 200_000
+    # Ảnh mật độ được ước lượng từ một mẫu phân tầng cỡ này để chi phí không tăng theo dữ liệu
+    DENSITY_SAMPLE = 200_000
+    BINS = 256
+    # Bán kính (pixel) để coi là đang trỏ vào một điểm
+    HIT_RADIUS_PX = 6
+
+    def __init__(self, ax, data, colors, s=25, alpha=0.7):
+        self.ax = ax
+        self.colors = np.array([to_rgba(c) for c in colors])
+        self.points, self.cluster_of, self.rank, self.rows = data
+        k = len(self.colors)
+
+        self.scatters = [
+            ax.scatter([], [], s=s, alpha=alpha, color=self.colors[i], label=f"Cluster {i}")
+            for i in range(k)
+        ]
+        self.density = ax.imshow(
+            np.zeros((1, 1, 4)), origin="lower", aspect="auto",
+            interpolation="nearest", zorder=0, extent=(0, 1, 0, 1),
+        )
+
+        if len(self.points):
+            lo = self.points.min(axis=0)
+            hi = self.points.max(axis=0)
+            pad = (hi - lo) * 0.05 + 1e-9
+            ax.set_xlim(lo[0] - pad[0], hi[0] + pad[0])
+            ax.set_ylim(lo[1] - pad[1], hi[1] + pad[1])
+        # Giữ nguyên giới hạn trục khi đổi dữ liệu của các artist
+        ax.set_autoscale_on(False)
+
+        self.level = None
+        self.view = None
+        self.shown = np.empty(0, dtype=np.int64)
+        self.cells = None
+        self.tree = None
+        self.tree_key = None
+        ax.callbacks.connect("xlim_changed", self.update)
+        ax.callbacks.connect("ylim_changed", self.update)
+        self.update()
+
+    @staticmethod
+    def prepare(X2d, labels, k, seed=0):
+        """Chuẩn bị dữ liệu (có thể chạy trong worker): điểm xếp theo x, cụm của từng điểm,
+        hạng ngẫu nhiên trong cụm chuẩn hoá về [0, 1) và chỉ số hàng gốc của từng điểm
+
+        Lấy các điểm có rank < tỉ lệ cho ra mẫu phân tầng ổn định (không nhảy lung tung khi pan).
+        """
+        labels = np.asarray(labels)
+        rng = np.random.default_rng(seed)
+        rank = np.empty(len(labels))
+        for i in range(k):
+            members = np.flatnonzero(labels == i)
+            rank[members] = rng.permutation(len(members)) / max(len(members), 1)
+
+        order = np.argsort(X2d[:, 0], kind="stable")
+        return np.asarray(X2d)[order], labels[order], rank[order], order
+
+    def visible(self):
+        """Chỉ số các điểm nằm trong vùng đang nhìn (điểm đã xếp theo x nên chỉ cần bisect)"""
+        (x0, x1), (y0, y1) = sorted(self.ax.get_xlim()), sorted(self.ax.get_ylim())
+        x = self.points[:, 0]
+        lo, hi = np.searchsorted(x, x0, side="left"), np.searchsorted(x, x1, side="right")
+        y = self.points[lo:hi, 1]
+        return lo + np.flatnonzero((y >= y0) & (y <= y1))
+
+    def update(self, *_):
+        view = (self.ax.get_xlim(), self.ax.get_ylim())
+        if view == self.view:
+            return
+        self.view = view
+
+        idx = self.visible()
+        if len(idx) > self.DENSITY_THRESHOLD:
+            self.level = "density"
+            n_visible = len(idx)
+            if n_visible > self.DENSITY_SAMPLE:
+                idx = idx[self.rank[idx] < self.DENSITY_SAMPLE / n_visible]
+            self._show_density(idx, n_visible)
+            shown = np.empty(0, dtype=np.int64)
+        else:
+            self.density.set_visible(False)
+            if len(idx) > self.MAX_POINTS:
+                self.level = "sample"
+                shown = idx[self.rank[idx] < self.MAX_POINTS / len(idx)]
+            else:
+                self.level = "points"
+                shown = idx
+
+        if self.level != "density":
+            self.cells = None
+        self.shown = shown
+        self.tree = None
+        clusters = self.cluster_of[shown]
+        for i, scatter in enumerate(self.scatters):
+            scatter.set_offsets(self.points[shown[clusters == i]])
+
+    def hit(self, x, y):
+        """Phần tử dưới con trỏ tại toạ độ pixel (x, y)
+
+        Trả về ("point", chỉ số điểm) khi đang vẽ điểm, ("cell", (cụm, số điểm ước lượng))
+        khi đang vẽ ảnh mật độ, None nếu không trỏ vào gì.
+        """
+        if self.cells is not None:
+            counts, scale = self.cells
+            (x0, x1), (y0, y1) = sorted(self.ax.get_xlim()), sorted(self.ax.get_ylim())
+            dx, dy = self.ax.transData.inverted().transform((x, y))
+            bx = int((dx - x0) / (x1 - x0) * self.BINS)
+            by = int((dy - y0) / (y1 - y0) * self.BINS)
+            if not (0 <= bx < self.BINS and 0 <= by < self.BINS) or counts[:, by, bx].sum() == 0:
+                return None
+            cluster = int(counts[:, by, bx].argmax())
+            return "cell", (cluster, int(round(counts[:, by, bx].sum() * scale)))
+
+        if not len(self.shown):
+            return None
+        # KD-tree trên toạ độ pixel của các điểm đang hiển thị (tối đa MAX_POINTS), dựng lại
+        # khi vùng nhìn hoặc kích thước axes đổi
+        key = (self.view, tuple(self.ax.bbox.bounds))
+        if self.tree_key != key:
+            self.tree = cKDTree(self.ax.transData.transform(self.points[self.shown]))
+            self.tree_key = key
+        dist, i = self.tree.query((x, y), distance_upper_bound=self.HIT_RADIUS_PX)
+        if not np.isfinite(dist):
+            return None
+        return "point", int(self.shown[i])
+
+    def _show_density(self, idx, n_visible):
+        (x0, x1), (y0, y1) = sorted(self.ax.get_xlim()), sorted(self.ax.get_ylim())
+        pts = self.points[idx]
+        k = len(self.scatters)
+        # Đếm theo (cụm, ô) bằng một lần bincount
+        bx = np.clip(((pts[:, 0] - x0) / (x1 - x0) * self.BINS).astype(np.int64), 0, self.BINS - 1)
+        by = np.clip(((pts[:, 1] - y0) / (y1 - y0) * self.BINS).astype(np.int64), 0, self.BINS - 1)
+        cell = by * self.BINS + bx
+        counts = np.bincount(self.cluster_of[idx] * self.BINS * self.BINS + cell, minlength=k * self.BINS * self.BINS)
+        counts = counts.reshape(k, self.BINS, self.BINS)
+        # Giữ lại để tra cứu khi rê chuột; scale đổi số đếm trên mẫu về số điểm thật
+        self.cells = (counts, n_visible / max(len(idx), 1))
+
+        total = counts.sum(axis=0)
+        image = self.colors[counts.argmax(axis=0)].copy()
+        image[..., 3] = np.log1p(total) / np.log1p(max(total.max(), 1))
+        self.density.set_data(image)
+        self.density.set_extent((x0, x1, y0, y1))
+        self.density.set_visible(True)
@@ -0,0 +1,269 @@
+import os
+import time
+from pathlib import Path
+from PyQt6.QtWidgets import QLabel, QStackedWidget, QMainWindow, QToolBar, QProgressBar, QMessageBox, QFileDialog
+from PyQt6.QtCore import Qt, QThread, pyqtSignal
+from PyQt6.QtGui import QAction
+
+from screen.SearchTermScreen import SearchTermScreen
+from screen.SearchDocsScreen import SearchDocsScreen
+from screen.SearchTermDocsScreen import SearchTermDocsScreen
+from screen.PerfPanel import PerfPanel
+from core.DataLoader import load_terms, load_docs, precision_dtype
+from core.SimilarityEngine import SimilarityEngine
+from core.Vocabulary import TermVectors
+from core.QueryFolder import QueryFolder
+from core.QueryCache import QueryCache
+from core.MemoryReport import memory_report, format_report
+from core.Instrumentation import tracer
+
+# Độ chính xác của ma trận embedding: float32 (mặc định), float64, hoặc int8 (quét thô mU bằng int8)
+PRECISION = os.environ.get("DLL_PRECISION", "float32")
+
+
+class DataLoaderWorker(QThread):
+    progress = pyqtSignal(str, int, int, int, float)
+    terms_ready = pyqtSignal(object, object, object, list, object)
+    docs_ready = pyqtSignal(list, object, object, object, object, object, object)
+    failed = pyqtSignal(str, str)
+
+    def __init__(self, base_path, precision="float32"):
+        super().__init__()
+        precision_dtype(precision)
+        self.base_path = base_path
+        self.precision = precision
+
+    def run(self):
+        """Đọc topics -> terms -> docs trong background, báo tiến độ theo từng chunk"""
+        try:
+            with tracer.span("load_terms", precision=self.precision):
+                terms = load_terms(self.base_path, self.precision, self._progress("terms"))
+            self.terms_ready.emit(*terms)
+        except InterruptedError:
+            return
+        except Exception as e:
+            self.failed.emit("terms", str(e))
+            return
+
+        try:
+            with tracer.span("load_docs", precision=self.precision):
+                docs = load_docs(self.base_path, self.precision, self._progress("docs"))
+            self.docs_ready.emit(*docs)
+        except InterruptedError:
+            return
+        except Exception as e:
+            self.failed.emit("docs", str(e))
+
+    def _progress(self, kind):
+        start = time.perf_counter()
+
+        def on_progress(rows, bytes_read, total_bytes):
+            if self.isInterruptionRequested():
+                raise InterruptedError
+            elapsed = time.perf_counter() - start
+            eta = elapsed / bytes_read * (total_bytes - bytes_read) if bytes_read else -1.0
+            self.progress.emit(kind, rows, bytes_read, total_bytes, eta)
+
+        return on_progress
+
+
+class MainWindow(QMainWindow):
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle("Big data Wikipedia")
+        self.resize(800, 600)
+        self.term_list = []
+        self.term_dict = {}
+        self.doc_list = []
+        # Cache kết quả top-k dùng chung cho mọi màn hình tìm kiếm
+        self.query_cache = QueryCache()
+
+        # Màn hình chỉ được dựng khi mở lần đầu từ toolbar, xem show_screen
+        self.plot_screen = None
+        self.search_term_screen = None
+        self.search_doc_screen = None
+        self.search_termdoc_screen = None
+        self.screen_factories = {
+            "plot_screen": self.create_plot_screen,
+            "search_term_screen": lambda: SearchTermScreen(self.vocabulary, self.term_engine),
+            "search_doc_screen": lambda: SearchDocsScreen(self.doc_engine, self.doc_list, self.title_index),
+            "search_termdoc_screen": lambda: SearchTermDocsScreen(self.doc_engine, self.query_folder, self.doc_list),
+        }
+
+        # Create stacked widget, screens are added when they are first opened
+        self.stacked = QStackedWidget()
+        self.loading_label = QLabel("Loading data ...")
+        self.loading_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.loading_label.setStyleSheet("color: gray; font-size: 16px;")
+        self.stacked.addWidget(self.loading_label)
+
+        self.setCentralWidget(self.stacked)
+
+        # Toolbar to switch screens
+        toolbar = QToolBar("Navigation")
+        self.addToolBar(toolbar)
+
+        self.plot_action = QAction("Plot", self)
+        self.plot_action.triggered.connect(lambda: self.show_screen("plot_screen"))
+
+        self.search_term_action = QAction("Term Relevance", self)
+        self.search_term_action.triggered.connect(lambda: self.show_screen("search_term_screen"))
+
+        self.search_doc_action = QAction("Doc Relevance", self)
+        self.search_doc_action.triggered.connect(lambda: self.show_screen("search_doc_screen"))
+
+        self.search_termdoc_action = QAction("TermDoc Relevance", self)
+        self.search_termdoc_action.triggered.connect(lambda: self.show_screen("search_termdoc_screen"))
+
+        for action in (self.plot_action, self.search_term_action, self.search_doc_action, self.search_termdoc_action):
+            action.setEnabled(False)
+            toolbar.addAction(action)
+
+        self.memory_action = QAction("Memory", self)
+        self.memory_action.triggered.connect(self.show_memory_report)
+        toolbar.addAction(self.memory_action)
+
+        # Ghi span/counter (tắt mặc định, DLL_TRACE=1 để bật từ đầu) và xuất ra file trace của Chrome
+        self.trace_action = QAction("Trace", self)
+        self.trace_action.setCheckable(True)
+        self.trace_action.setChecked(tracer.enabled)
+        self.trace_action.toggled.connect(self.set_tracing)
+        toolbar.addAction(self.trace_action)
+
+        self.export_trace_action = QAction("Export Trace", self)
+        self.export_trace_action.triggered.connect(self.export_trace)
+        toolbar.addAction(self.export_trace_action)
+
+        # Status bar to show loading progress
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 1000)
+        self.progress_bar.setFixedWidth(200)
+        self.statusBar().addPermanentWidget(self.progress_bar)
+        self.perf_panel = PerfPanel(self.query_cache)
+        self.statusBar().addPermanentWidget(self.perf_panel)
+
+        self.read_file()
+
+    def read_file(self):
+        """Đọc embedding từ file trong background (store nhị phân hoặc JSON)"""
+        self.load_started = tracer.start()
+        self.loader = DataLoaderWorker(Path(os.getcwd()), PRECISION)
+        self.loader.progress.connect(self.on_load_progress)
+        self.loader.terms_ready.connect(self.on_terms_loaded)
+        self.loader.docs_ready.connect(self.on_docs_loaded)
+        self.loader.failed.connect(self.on_load_failed)
+        self.loader.start()
+
+    def on_load_progress(self, kind, rows, bytes_read, total_bytes, eta):
+        eta_text = f", ETA {eta:.0f}s" if eta >= 0 else ""
+        self.statusBar().showMessage(
+            f"Loading {kind}: {rows:,} rows, {bytes_read / 1e6:.1f}/{total_bytes / 1e6:.1f} MB{eta_text}"
+        )
+        if total_bytes:
+            self.progress_bar.setValue(int(1000 * bytes_read / total_bytes))
+
+    def on_terms_loaded(self, vocabulary, mV, term_normed, topic_data, term_knn):
+        self.topic_data = topic_data
+        self.vocabulary = vocabulary
+        self.term_list = vocabulary.terms
+        self.mV = mV # V matrix
+        # term -> view vào hàng của mV, không sao chép dữ liệu
+        self.term_dict = TermVectors(self.vocabulary, self.mV)
+        # Chuẩn hoá L2 một lần để mọi màn hình tìm kiếm dùng chung
+        self.query_cache.clear("terms")
+        self.term_engine = SimilarityEngine(self.mV, term_normed, cache=self.query_cache, name="terms", knn=term_knn)
+        self.query_folder = QueryFolder.from_topics(self.vocabulary, self.mV, self.topic_data)
+
+        self.plot_action.setEnabled(True)
+        self.search_term_action.setEnabled(True)
+        # Mở màn hình tìm term (nhẹ); phân tích của Plot chỉ chạy khi người dùng mở màn hình đó
+        self.show_screen("search_term_screen")
+
+    def on_docs_loaded(self, doc_list, mU, doc_normed, doc_ann, title_index, doc_quantized, doc_knn):
+        self.doc_list = doc_list
+        self.title_index = title_index
+        self.mU = mU # U matrix
+        self.query_cache.clear("docs")
+        self.doc_engine = SimilarityEngine(
+            self.mU, doc_normed, doc_ann, cache=self.query_cache, name="docs", quantized=doc_quantized, knn=doc_knn
+        )
+
+        if self.plot_screen is not None:
+            self.plot_screen.set_documents(self.mU, self.doc_list)
+
+        self.search_doc_action.setEnabled(True)
+        self.search_termdoc_action.setEnabled(True)
+        self.progress_bar.hide()
+        tracer.finish("read_file", self.load_started, terms=len(self.term_list), docs=len(self.doc_list))
+        self.statusBar().showMessage(f"Loaded {len(self.term_list):,} terms, {len(self.doc_list):,} docs", 5000)
+
+    def show_screen(self, name):
+        """Chuyển tới màn hình `name` (vd. "plot_screen"), dựng nó nếu đây là lần mở đầu tiên"""
+        screen = getattr(self, name)
+        if screen is None:
+            with tracer.span("screen.create", screen=name):
+                screen = self.screen_factories[name]()
+            setattr(self, name, screen)
+            self.stacked.addWidget(screen)
+        self.stacked.setCurrentWidget(screen)
+        return screen
+
+    def create_plot_screen(self):
+        # PlotScreen kéo theo Matplotlib và scikit-learn nên chỉ được import khi mở Plot lần đầu
+        from screen.PlotScreen import PlotScreen
+
+        plot_screen = PlotScreen(self.mV, self.term_list, self.topic_data)
+        if hasattr(self, "mU"):
+            plot_screen.set_documents(self.mU, self.doc_list)
+        return plot_screen
+
+    def memory_structures(self):
+        """Các cấu trúc dữ liệu chính, ma trận gốc đứng trước để view/tên dùng chung được tính cho chủ sở hữu"""
+        structures = {}
+        if hasattr(self, "term_engine"):
+            structures["mV"] = self.mV
+            structures["mV normed"] = self.term_engine.normed
+            structures["term_list + vocabulary"] = self.vocabulary
+            structures["term_dict (row views)"] = self.term_dict
+            structures["mV knn graph"] = self.term_engine.knn
+            structures["topics"] = self.topic_data
+        if hasattr(self, "doc_engine"):
+            structures["mU"] = self.mU
+            structures["mU normed"] = self.doc_engine.normed
+            structures["mU int8"] = self.doc_engine.quantized
+            structures["mU knn graph"] = self.doc_engine.knn
+            structures["doc_list"] = self.doc_list
+            structures["title_index"] = self.title_index
+            structures["ann index"] = self.doc_engine.ann
+        structures["query cache"] = self.query_cache
+        return structures
+
+    def show_memory_report(self):
+        report = format_report(memory_report(self.memory_structures()))
+        box = QMessageBox(self)
+        box.setWindowTitle("Memory usage")
+        box.setText(f"<pre>{report}</pre>")
+        box.show()
+
+    def set_tracing(self, enabled):
+        tracer.enabled = enabled
+        self.perf_panel.refresh()
+
+    def export_trace(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Export trace", "trace.json", "Chrome trace (*.json)")
+        if not path:
+            return
+        count = tracer.export_chrome_trace(path)
+        hint = "" if tracer.enabled else " (enable Trace to record spans)"
+        self.statusBar().showMessage(f"Exported {count:,} events to {path}{hint}", 5000)
+
+    def on_load_failed(self, kind, message):
+        tracer.finish("read_file", self.load_started, failed=kind)
+        self.progress_bar.hide()
+        self.loading_label.setText(f"Failed to load {kind}: {message}")
+        self.statusBar().showMessage(f"Failed to load {kind}: {message}")
+
+    def closeEvent(self, event):
+        self.loader.requestInterruption()
+        self.loader.wait()
+        super().closeEvent(event)
@@ -0,0 +1,42 @@
+from PyQt6.QtWidgets import QLabel
+from PyQt6.QtCore import QTimer
+
+from core.Instrumentation import tracer, current_rss_bytes
+
+
+class PerfPanel(QLabel):
+    """Chỉ số hiệu năng trên status bar: latency lượt tìm gần nhất, RSS và cache kết quả
+
+    Tooltip liệt kê thời lượng gần nhất của mọi thao tác đã đo (load, tìm kiếm, vẽ biểu đồ, ...).
+    """
+
+    REFRESH_MS = 1000
+
+    def __init__(self, query_cache, parent=None):
+        super().__init__(parent)
+        self.query_cache = query_cache
+        self.setStyleSheet("color: gray; padding: 0 6px;")
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start(self.REFRESH_MS)
+        self.refresh()
+
+    def refresh(self):
+        parts = []
+        last = tracer.latest("search.")
+        parts.append(f"Search {last[1]:.1f} ms" if last else "Search -")
+
+        rss = current_rss_bytes()
+        if rss is not None:
+            parts.append(f"RSS {rss / 1e6:,.0f} MB")
+            tracer.gauge("rss_mb", round(rss / 1e6, 1))
+
+        stats = self.query_cache.stats()
+        parts.append(
+            f"Cache {stats['hits']:,}/{stats['hits'] + stats['misses']:,} hits, {stats['bytes'] / 1e6:.1f} MB"
+        )
+        self.setText("  |  ".join(parts))
+
+        lines = [f"{name}: {ms:,.1f} ms" for name, ms in tracer.durations()]
+        lines.append(f"Tracing {'on' if tracer.enabled else 'off'}, {len(tracer.events):,} events")
+        self.setToolTip("\n".join(lines))
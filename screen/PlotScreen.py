@@ -1,43 +1,83 @@
 import sys
 import os
 import json
+import time
+import bisect
+import traceback
 import numpy as np
 from pathlib import Path
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLineEdit,
     QPushButton, QLabel, QStackedWidget, QScrollArea, QMainWindow, QToolBar,
-    QSizePolicy
+    QSizePolicy, QComboBox, QSpinBox
 )
-from PyQt6.QtCore import Qt, QThread, pyqtSignal
+from PyQt6.QtCore import Qt, QThread, QTimer, pyqtSignal
 from PyQt6.QtGui import QAction
 from sklearn.preprocessing import normalize
-from sklearn.decomposition import PCA
-from sklearn.cluster import KMeans
-from sklearn.metrics import silhouette_score
 from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
+from matplotlib.backends.backend_qtagg import NavigationToolbar2QT as NavigationToolbar
 from matplotlib.figure import Figure
+import matplotlib
 import matplotlib.pyplot as plt
 import matplotlib.cm as cm
 from matplotlib.patches import Circle
 
+from core.Clustering import (
+    silhouette_sweep, make_model, fit_streaming, predict_chunked, pca_project,
+    SILHOUETTE_SAMPLE
+)
+from core.ResultCache import ResultCache, fingerprint
+from core.Instrumentation import tracer
+from screen.LODScatter import LODScatter
+from screen.HoverTip import HoverTip
+
 class SilhouetteWorker(QThread):
+    K_RANGE = range(2, 15)
+
     progress = pyqtSignal(str)
-    finished = pyqtSignal(list, int, list, list, list, list, object, object, object)
+    failed = pyqtSignal(str)
+    score_ready = pyqtSignal(int, float)
+    finished = pyqtSignal(list, int, list, list, list, list, object, object, object, object)
 
-    def __init__(self, X, topics):
+    def __init__(self, X, topics, backend="kmeans", batch_size=4096):
         super().__init__()
         self.X = X
         self.top_topics = topics
+        self.backend = backend
+        self.batch_size = batch_size
+        self.cache = ResultCache()
 
     def run(self):
-        """Tính silhouette score trong background"""
-        K = range(2, 15)
-        scores = []
-        for k in K:
-            kmeans = KMeans(n_clusters=k, random_state=42, n_init=10)
-            kmeans.fit(self.X)
-            score = silhouette_score(self.X, kmeans.labels_)
-            scores.append(score)
+        """Tính silhouette score trong background, mỗi k chạy song song trên một process"""
+        try:
+            with tracer.span("SilhouetteWorker.run", rows=int(self.X.shape[0]), backend=self.backend):
+                self._run()
+        except Exception as e:
+            # Pool hỏng, lỗi sklearn, hết bộ nhớ...: báo về GUI thread để mở lại nút Run
+            traceback.print_exc()
+            self.failed.emit(f"{type(e).__name__}: {e}")
+
+    def _run(self):
+        K = self.K_RANGE
+        self.progress.emit("Fingerprinting data ...")
+        fp = fingerprint(self.X)
+        params = dict(seed=42, backend=self.backend, batch_size=self.batch_size, normalization="l2")
+
+        sweep_key = ResultCache.key(fp, K=list(K), sample_size=SILHOUETTE_SAMPLE, **params)
+        cached = self.cache.load("sweep", sweep_key)
+        if cached is not None:
+            scores = [float(x) for x in cached["scores"]]
+            for k, score in zip(K, scores):
+                self.score_ready.emit(k, score)
+        else:
+            done = {}
+            with tracer.span("silhouette.sweep", k_count=len(K)):
+                for k, score in silhouette_sweep(self.X, K, backend=self.backend, batch_size=self.batch_size):
+                    done[k] = score
+                    self.score_ready.emit(k, score)
+                    self.progress.emit(f"Silhouette: {len(done)}/{len(K)}")
+            scores = [done[k] for k in K]
+            self.cache.save("sweep", sweep_key, scores=np.array(scores))
         # best_k = K[int(np.argmax(scores))]
         best_k = 5
         """Tính độ mạnh topic trong background"""
@@ -47,23 +87,47 @@ class SilhouetteWorker(QThread):
             topics.append(t["topic"])
             values.append(t["singular_value"])
         """Dùng kmean để chia cụm trong background"""
-        X_norm = normalize(self.X)
-        # X_norm = self.X
-        kmeans = KMeans(n_clusters=best_k, random_state=42, n_init=10)
-        labels = kmeans.fit_predict(X_norm)
-        centers = kmeans.cluster_centers_
+        self.cluster_key = ResultCache.key(fp, k=best_k, projection="all", **params)
+        # Phép chiếu PCA được cache theo cùng key với kết quả phân cụm
+        self.pca_cached = self.cache.load("pca", self.cluster_key)
+        cached = self.cache.load("cluster", self.cluster_key)
+        if cached is not None:
+            labels, centers = cached["labels"], cached["centers"]
+        else:
+            self.progress.emit(f"Clustering {self.X.shape[0]:,} rows ...")
+            with tracer.span("cluster.fit", k=best_k):
+                if self.backend == "stream":
+                    kmeans = fit_streaming(self.X, best_k, batch_size=self.batch_size, unit_rows=True)
+                    labels = predict_chunked(kmeans, self.X, unit_rows=True)
+                else:
+                    kmeans = make_model(best_k, self.backend, batch_size=self.batch_size)
+                    labels = kmeans.fit_predict(normalize(self.X))
+            centers = kmeans.cluster_centers_
+            self.cache.save("cluster", self.cluster_key, labels=labels, centers=centers)
+
+        if self.pca_cached is not None:
+            X2d, centers2d = self.pca_cached["X2d"], self.pca_cached["centers2d"]
+        else:
+            # Chiếu PCA 2D trong background theo chunk, main thread chỉ nhận mảng đã sẵn sàng để vẽ
+            self.progress.emit("PCA projection ...")
+            with tracer.span("pca"):
+                X2d, centers2d = pca_project(self.X, centers, unit_rows=True)
+            self.cache.save("pca", self.cluster_key, X2d=X2d, centers2d=centers2d)
+        scatter_data = LODScatter.prepare(X2d, labels, best_k)
         unique, counts = np.unique(labels, return_counts=True)
 
-        self.finished.emit(scores, best_k, topics, values, unique, counts, X_norm, centers, labels)
+        self.finished.emit(scores, best_k, topics, values, unique, counts, X2d, centers2d, labels, scatter_data)
 
 class PlotScreen(QWidget):
-    def __init__(self,term_dict, term_list, term_emb_data, doc_emb_data, topic_data):
+    # Một frame ở 60 FPS
+    FRAME_BUDGET_MS = 16
+
+    def __init__(self, mV, term_list, topic_data):
         super().__init__()
         #init variabels
-        self.term_dict = term_dict
+        # Dùng thẳng ma trận term (có thể là mmap), không tạo bản sao
+        self.X = mV
         self.term_list = term_list
-        self.term_emb_data = term_emb_data
-        self.doc_emb_data = doc_emb_data
         self.topics_data = topic_data
 
         layout = QVBoxLayout(self)
@@ -76,6 +140,29 @@ class PlotScreen(QWidget):
         self.status_label.setStyleSheet("color: red; font-weight: bold; margin-top: 8px;")
         layout.addWidget(self.status_label)
 
+        # Clustering options
+        controls = QHBoxLayout()
+        self.source_box = QComboBox()
+        self.source_box.addItem("Terms")
+        self.source_box.currentTextChanged.connect(self.on_source_changed)
+        self.backend_box = QComboBox()
+        self.backend_box.addItem("KMeans", "kmeans")
+        self.backend_box.addItem("MiniBatchKMeans", "minibatch")
+        self.backend_box.addItem("MiniBatch streaming", "stream")
+        self.batch_box = QSpinBox()
+        self.batch_box.setPrefix("Batch: ")
+        self.batch_box.setRange(256, 262144)
+        self.batch_box.setSingleStep(1024)
+        self.batch_box.setValue(4096)
+        self.run_button = QPushButton("Run")
+        self.run_button.clicked.connect(self.run_analysis)
+        controls.addWidget(self.source_box)
+        controls.addWidget(self.backend_box)
+        controls.addWidget(self.batch_box)
+        controls.addWidget(self.run_button)
+        controls.addStretch()
+        layout.addLayout(controls)
+
 
         # Create matplotlib figure
         scroll = QScrollArea()
@@ -90,21 +177,70 @@ class PlotScreen(QWidget):
         self.figure = Figure(figsize=(4, 3))
         self.canvas = FigureCanvas(self.figure)
         self.container_layout.addWidget(self.canvas)
-        
-        # Plot
-        if self.term_dict:
-            self.X = np.array(list(self.term_dict.values()))
+        self.sections = []
+        self.mU = None
+        self.doc_list = []
+        # Phân tích chạy lần đầu khi màn hình được hiện (showEvent) hoặc khi bấm Run
+        self.analysis_started = False
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if not self.analysis_started and len(self.X):
             self.start_plot_thread(self.X, self.topics_data)
 
-
-    def start_plot_thread(self, X, topics):
+    def set_documents(self, mU, doc_list):
+        """Cho phép phân cụm ma trận tài liệu khi đã load xong"""
+        self.mU = mU
+        self.doc_list = doc_list
+        self.source_box.addItem("Documents")
+
+    def on_source_changed(self, source):
+        # Ma trận tài liệu lớn: mặc định dùng partial_fit theo chunk
+        if source == "Documents":
+            self.backend_box.setCurrentIndex(self.backend_box.findData("stream"))
+
+    def run_analysis(self):
+        X = self.mU if self.source_box.currentText() == "Documents" else self.X
+        for widget in self.sections:
+            self.container_layout.removeWidget(widget)
+            widget.deleteLater()
+        self.sections = []
+        self.start_plot_thread(X, self.topics_data, self.backend_box.currentData(), self.batch_box.value())
+
+    def start_plot_thread(self, X, topics, backend="kmeans", batch_size=4096):
         """Chạy tính toán silhouette score trong thread riêng"""
+        self.analysis_started = True
         self.status_label.setText("Plotting ...")
-        self.worker = SilhouetteWorker(X, topics)
+        self.run_button.setEnabled(False)
+        self.item_name = "tài liệu" if X is self.mU else "từ"
+        # Tên từng hàng của X để hiện khi rê chuột lên scatter
+        self.item_names = self.doc_list if X is self.mU else self.term_list
+        # Biểu đồ silhouette được vẽ dần theo từng điểm (k, score) worker gửi về
+        self.silhouette_points = {}
+        self.add_plot_section("📊 Biểu đồ 1: Silhouette Score", self.plot_silhouette)
+
+        self.worker = SilhouetteWorker(X, topics, backend, batch_size)
+        self.worker.score_ready.connect(self.add_silhouette_point)
+        self.worker.progress.connect(self.status_label.setText)
         self.worker.finished.connect(self.plot)
+        self.worker.failed.connect(self.on_worker_failed)
         self.worker.start()
 
-    def plot(self, scores, best_k, topics, values, unique, counts, X_norm, centers, labels):
+    def on_worker_failed(self, message):
+        self.status_label.setText(f"Analysis failed: {message}")
+        self.status_label.setToolTip("")
+        self.run_button.setEnabled(True)
+
+    def add_silhouette_point(self, k, score):
+        self.silhouette_points[k] = score
+        ks = sorted(self.silhouette_points)
+        self.silhouette_line.set_data(ks, [self.silhouette_points[i] for i in ks])
+        ax = self.silhouette_line.axes
+        ax.relim()
+        ax.autoscale_view()
+        self.silhouette_line.figure.canvas.draw_idle()
+
+    def plot(self, scores, best_k, topics, values, unique, counts, X2d, centers2d, labels, scatter_data):
         """Vẽ biểu đồ sau khi thread hoàn tất"""
         self.silhouette_scores = scores
         self.best_k = best_k
@@ -112,16 +248,48 @@ class PlotScreen(QWidget):
         self.strengthen_values =  values
         self.kmean_unique = unique
         self.kmean_counts = counts
-        self.X_norm = X_norm
-        self.kmeans_centers = centers
+        self.X2d = X2d
+        self.centers2d = centers2d
         self.kmeans_labels = labels
-
-        self.add_plot_section("📊 Biểu đồ 1: Silhouette Score", self.plot_silhouette)
-        self.add_plot_section("", self.plot_kmeans, False)
-        self.add_plot_section("", self.plot_kmeans_scatter, False)
-        self.add_plot_section("📈 Biểu đồ 2: Topic Strength", self.plot_topics)
-
+        self.scatter_data = scatter_data
+        self.hover_tips = []
+        self.plot_started = tracer.start()
+
+        self.plot_steps = self.plot_sections([
+            ("", self.plot_kmeans, False),
+            ("", self.plot_kmeans_scatter, False),
+            ("📈 Biểu đồ 2: Topic Strength", self.plot_topics, True),
+        ])
+        self.gui_blocked_ms = []
+        QTimer.singleShot(0, self.run_next_plot_step)
+
+    def plot_sections(self, sections):
+        """Dựng rồi render từng biểu đồ, mỗi bước chạy trong một lượt riêng của event loop"""
+        for title, plot_func, with_label in sections:
+            canvas = self.add_plot_section(title, plot_func, with_label)
+            yield
+            canvas.draw()
+            yield
+
+    def run_next_plot_step(self):
+        start = time.perf_counter()
+        with tracer.span("plot.step", step=len(self.gui_blocked_ms)):
+            finished = next(self.plot_steps, True)
+        self.gui_blocked_ms.append((time.perf_counter() - start) * 1000)
+        if not finished:
+            QTimer.singleShot(0, self.run_next_plot_step)
+            return
+
+        tracer.finish("PlotScreen.plot", self.plot_started, steps=len(self.gui_blocked_ms))
+
+        worst = max(self.gui_blocked_ms)
+        over = " (over budget)" if worst > self.FRAME_BUDGET_MS else ""
         self.status_label.setText(f"Plot completed")
+        self.status_label.setToolTip(
+            f"GUI thread blocked: max {worst:.1f} ms per step, total {sum(self.gui_blocked_ms):.1f} ms, "
+            f"frame budget {self.FRAME_BUDGET_MS} ms{over}"
+        )
+        self.run_button.setEnabled(True)
 
     def add_plot_section(self, title: str, plot_func, with_label = True):
         """Tạo một section gồm label + canvas riêng"""
@@ -131,6 +299,7 @@ class PlotScreen(QWidget):
             label.setAlignment(Qt.AlignmentFlag.AlignLeft)
             label.setStyleSheet("font-weight: bold; font-size: 14px; color: #1a237e; margin-bottom: 6px;")
             self.container_layout.addWidget(label)
+            self.sections.append(label)
 
         # Figure & canvas
         figure = Figure(figsize=(6, 3))
@@ -138,16 +307,19 @@ class PlotScreen(QWidget):
         canvas.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
         canvas.setMinimumSize(400, 300)
         self.container_layout.addWidget(canvas)
+        self.sections.append(canvas)
 
         # Gọi hàm vẽ cụ thể
         plot_func(figure)
+        return canvas
 
 
     def plot_silhouette(self, figure):
-        """Vẽ biểu đồ Silhouette"""
+        """Vẽ biểu đồ Silhouette (rỗng lúc đầu, cập nhật dần qua add_silhouette_point)"""
         ax = figure.add_subplot(111)
-        K = np.arange(2, 15)
-        ax.plot(K, self.silhouette_scores, "bo-", linewidth=2)
+        K = SilhouetteWorker.K_RANGE
+        self.silhouette_line, = ax.plot([], [], "bo-", linewidth=2)
+        ax.set_xlim(K[0] - 0.5, K[-1] + 0.5)
         ax.set_xlabel("Số cụm (k)")
         ax.set_ylabel("Silhouette Score")
         ax.set_title("Đánh giá số cụm KMeans bằng Silhouette Score")
@@ -181,79 +353,59 @@ class PlotScreen(QWidget):
         self.on_hover(figure, ax3, bars, self.strengthen_topics)
 
     def on_hover(self, figure, ax, bars, cluster_ids):
-        canvas = figure.canvas
-
-        
-        tooltip = QLabel(canvas)
-        tooltip.setStyleSheet("""
-            QLabel {
-                background-color: rgba(40, 40, 40, 220);
-                color: white;
-                border-radius: 4px;
-                padding: 3px 6px;
-                font-size: 11px;
-            }
-        """)
-        tooltip.hide()
-
-        def on_motion(event):
-            if event.inaxes == ax and event.guiEvent:
-                pos = event.guiEvent.position()
-                hovered = False
-
-                for i, bar in enumerate(bars):
-                    if bar.contains(event)[0]:
-                        count = int(bar.get_height())
-                        cluster_label = cluster_ids[i] if i < len(cluster_ids) else i
-
-                        tooltip.setText(f"Cụm {cluster_label}: {count} từ")
-
-                        
-                        x = int(pos.x()) + 12
-                        y = int(pos.y()) - 25
-                        tooltip.move(x, y)
-
-                        tooltip.show()
-                        hovered = True
-                        break
-
-                if not hovered:
-                    if tooltip.isVisible():
-                        tooltip.hide()
-                        canvas.draw_idle()  
-            else:
-                if tooltip.isVisible():
-                    tooltip.hide()
-                    canvas.draw_idle()  
-
-        canvas.mpl_connect("motion_notify_event", on_motion)
+        """Tooltip cho biểu đồ cột: tra cột theo x bằng bisect trên mép trái đã sắp xếp"""
+        extents = sorted(
+            (bar.get_x(), bar.get_x() + bar.get_width(), bar.get_height(), i)
+            for i, bar in enumerate(bars)
+        )
+        lefts = [e[0] for e in extents]
+
+        def hit_test(event):
+            if event.xdata is None:
+                return None
+            pos = bisect.bisect_right(lefts, event.xdata) - 1
+            if pos < 0:
+                return None
+            left, right, height, i = extents[pos]
+            if event.xdata > right or not (min(0, height) <= event.ydata <= max(0, height)):
+                return None
+            cluster_label = cluster_ids[i] if i < len(cluster_ids) else i
+            return f"Cụm {cluster_label}: {int(height)} {self.item_name}", None
+
+        self.hover_tips.append(HoverTip(ax, hit_test, self.FRAME_BUDGET_MS))
+
+    def on_scatter_hover(self, ax, lod):
+        """Tooltip cho scatter: tên từ/tài liệu của điểm gần con trỏ nhất, hoặc cụm chiếm đa số
+        của ô khi đang hiển thị ảnh mật độ"""
+        names = self.item_names
+
+        def hit_test(event):
+            hit = lod.hit(event.x, event.y)
+            if hit is None:
+                return None
+            kind, value = hit
+            if kind == "cell":
+                cluster, count = value
+                return f"Cụm {cluster}: ~{count:,} {self.item_name}", None
+            row = int(lod.rows[value])
+            name = names[row] if row < len(names) else row
+            return f"{name} (cụm {lod.cluster_of[value]})", lod.points[value]
+
+        self.hover_tips.append(HoverTip(ax, hit_test, self.FRAME_BUDGET_MS))
 
     def plot_kmeans_scatter(self, figure):
-        """Vẽ scatter các điểm + tâm cụm + vòng tròn KMeans"""
-        pca = PCA(n_components=2)
-        self.X2d = pca.fit_transform(self.X_norm)
-        self.centers2d = pca.transform(self.kmeans_centers)
-
-
+        """Vẽ scatter các điểm + tâm cụm + vòng tròn KMeans (PCA đã tính sẵn trong worker)"""
         ax = figure.add_subplot(111)
 
-        X2d = self.X2d
-        labels = self.kmeans_labels
         centers2d = self.centers2d
         k = self.best_k
 
         # Bảng màu
-        colors = cm.get_cmap('tab10')(np.linspace(0, 1, k))
-
-        # Vẽ điểm theo từng cụm
-        for i in range(k):
-            pts = X2d[labels == i]
-            ax.scatter(
-                pts[:, 0], pts[:, 1],
-                s=25, alpha=0.7,
-                color=colors[i],
-                label=f"Cluster {i}"
-            )
+        colors = matplotlib.colormaps['tab10'](np.linspace(0, 1, k))
+
+        # Vẽ điểm theo từng cụm, mức chi tiết đổi theo vùng đang zoom
+        self.lod_scatter = LODScatter(ax, self.scatter_data, colors, s=25, alpha=0.7)
+        self.on_scatter_hover(ax, self.lod_scatter)
 
         # Vẽ centroid
         ax.scatter(
@@ -285,6 +437,11 @@ class PlotScreen(QWidget):
         ax.set_title("Phân cụm KMeans (PCA 2D)")
         ax.set_xlabel("PCA Dimension 1")
         ax.set_ylabel("PCA Dimension 2")
-        ax.legend(loc="best", fontsize=8)
+        ax.legend(loc="upper right", fontsize=8)
         ax.grid(True, linestyle="--", alpha=0.3)
-        figure.tight_layout()
\ No newline at end of file
+        figure.tight_layout()
+
+        # Toolbar zoom/pan cho scatter
+        toolbar = NavigationToolbar(figure.canvas, self)
+        self.container_layout.addWidget(toolbar)
+        self.sections.append(toolbar)
\ No newline at end of file
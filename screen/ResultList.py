@@ -0,0 +1,152 @@
+import numpy as np
+
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel, QListView, QStyledItemDelegate, QStyle
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex, QRect, QSize, pyqtSignal
+from PyQt6.QtGui import QColor, QFontMetrics
+
+from core.Instrumentation import tracer
+
+
+class ResultModel(QAbstractListModel):
+    """Danh sách kết quả (row id + score tuỳ chọn) trên một list tên dùng chung
+
+    Chỉ giữ mảng row/score, tên được tra khi view cần vẽ hàng đó. Hàng được đưa ra view theo
+    từng trang PAGE_SIZE (canFetchMore/fetchMore) khi cuộn tới cuối danh sách.
+    """
+
+    PAGE_SIZE = 200
+    ScoreRole = Qt.ItemDataRole.UserRole + 1
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.names = []
+        self.rows = np.empty(0, dtype=np.int64)
+        self.scores = None
+        self.loaded = 0
+
+    def set_results(self, names, rows, scores=None):
+        self.beginResetModel()
+        self.names = names
+        self.rows = np.asarray(rows, dtype=np.int64)
+        self.scores = None if scores is None else np.asarray(scores)
+        self.loaded = min(len(self.rows), self.PAGE_SIZE)
+        self.endResetModel()
+
+    def clear(self):
+        self.set_results([], [])
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.loaded
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.loaded < len(self.rows)
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        count = min(self.PAGE_SIZE, len(self.rows) - self.loaded)
+        self.beginInsertRows(QModelIndex(), self.loaded, self.loaded + count - 1)
+        self.loaded += count
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= self.loaded:
+            return None
+        row = int(self.rows[index.row()])
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.ToolTipRole):
+            return str(self.names[row])
+        if role == Qt.ItemDataRole.UserRole:
+            return row
+        if role == self.ScoreRole and self.scores is not None:
+            return float(self.scores[index.row()])
+        return None
+
+
+class ResultDelegate(QStyledItemDelegate):
+    """Vẽ tiêu đề như link xanh đậm, score (nếu có) căn phải màu xám"""
+
+    SCORE_WIDTH = 70
+    PADDING = 8
+
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), option.fontMetrics.height() + 2 * self.PADDING)
+
+    def paint(self, painter, option, index):
+        painter.save()
+        if option.state & QStyle.StateFlag.State_Selected:
+            painter.fillRect(option.rect, option.palette.highlight())
+        elif option.state & QStyle.StateFlag.State_MouseOver:
+            painter.fillRect(option.rect, QColor("#f1f3f4"))
+
+        rect = option.rect.adjusted(8, 0, -8, 0)
+        score = index.data(ResultModel.ScoreRole)
+        if score is not None:
+            score_rect = QRect(rect.right() - self.SCORE_WIDTH, rect.top(), self.SCORE_WIDTH, rect.height())
+            painter.setPen(QColor("gray"))
+            painter.drawText(score_rect, Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter, f"{score:.3f}")
+            rect.setRight(score_rect.left() - 8)
+
+        font = option.font
+        font.setBold(True)
+        painter.setFont(font)
+        painter.setPen(QColor("#1A0DAB"))
+        title = QFontMetrics(font).elidedText(index.data(), Qt.TextElideMode.ElideRight, rect.width())
+        painter.drawText(rect, Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter, title)
+        painter.restore()
+
+
+class ResultList(QWidget):
+    """Khung kết quả dùng chung cho các màn hình tìm kiếm: một dòng thông báo + QListView
+
+    View chỉ vẽ các hàng đang nhìn thấy, nên hàng nghìn kết quả không tạo ra widget nào.
+    Phát `activated(row)` khi người dùng chọn một hàng.
+    """
+
+    activated = pyqtSignal(int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(10, 10, 10, 10)
+        layout.setSpacing(6)
+
+        self.message = QLabel()
+        self.message.setWordWrap(True)
+        self.message.setStyleSheet("font-size: 16px; margin: 4px 0;")
+        self.message.hide()
+        layout.addWidget(self.message)
+
+        self.model = ResultModel(self)
+        self.view = QListView()
+        self.view.setModel(self.model)
+        self.view.setItemDelegate(ResultDelegate(self.view))
+        # Mọi hàng cao bằng nhau: view không phải đo từng hàng khi cuộn
+        self.view.setUniformItemSizes(True)
+        # Tiêu đề dài được cắt bằng "…" thay vì cuộn ngang
+        self.view.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.view.setMouseTracking(True)
+        self.view.setStyleSheet("""
+            QListView { border: none; background: transparent; font-size: 16px; }
+        """)
+        self.view.clicked.connect(self._on_activated)
+        layout.addWidget(self.view)
+
+    def show_results(self, names, rows, scores=None, message=None):
+        with tracer.span("results.render", rows=len(rows)):
+            self.set_message(message)
+            self.model.set_results(names, rows, scores)
+            self.view.scrollToTop()
+
+    def set_message(self, message):
+        """Đặt dòng thông báo (HTML) phía trên danh sách, None để ẩn"""
+        self.message.setText(message or "")
+        self.message.setVisible(bool(message))
+
+    def clear(self, message=None):
+        self.model.clear()
+        self.set_message(message)
+
+    def _on_activated(self, index):
+        row = index.data(Qt.ItemDataRole.UserRole)
+        if row is not None:
+            self.activated.emit(row)
@@ -0,0 +1,106 @@
+from PyQt6.QtWidgets import QWidget, QHBoxLayout, QLineEdit, QPushButton, QSpinBox
+from PyQt6.QtCore import QTimer, pyqtSignal
+
+from core.Instrumentation import tracer
+
+
+class ProbeBox(QSpinBox):
+    """Núm chỉnh recall/tốc độ của index ANN: số cluster quét mỗi truy vấn, 0 = tìm chính xác
+
+    Tooltip là bảng recall@20 đo lúc build index. Không có index thì giá trị luôn là 0 và ô bị ẩn.
+    """
+
+    def __init__(self, ann, parent=None):
+        super().__init__(parent)
+        self.setFixedHeight(35)
+        self.setPrefix("Probes: ")
+        if ann is None:
+            self.setRange(0, 0)
+            self.hide()
+            return
+        self.setRange(0, ann.n_lists)
+        self.setValue(ann.suggested_probe())
+        table = ", ".join(f"{p}: {r:.2f}" for p, r in zip(ann.recall_probes, ann.recall_values))
+        self.setToolTip(f"Clusters scanned per query (0 = exact). Measured recall@20 — {table}")
+
+
+class SearchBar(QWidget):
+    """Ô tìm kiếm + nút Search (+ ProbeBox nếu có ann) dùng chung cho các màn hình tìm kiếm
+
+    `submitted` phát khi bấm Enter hoặc nút Search. `typed` phát khi người dùng ngừng gõ
+    TYPING_DELAY_MS (search-as-you-type); typed_at là mốc tracer.start() của phím gõ cuối, để
+    latency của lượt tìm được đo từ phím gõ chứ không phải từ lúc hết debounce.
+    """
+
+    # Gộp các phím gõ liên tiếp thành một lượt tìm; latency vẫn tính từ phím cuối (typed_at)
+    # nên con số đo được đã gồm cả khoảng chờ này
+    TYPING_DELAY_MS = 30
+
+    submitted = pyqtSignal()
+    typed = pyqtSignal()
+
+    def __init__(self, placeholder, ann=None, with_probes=False, parent=None):
+        super().__init__(parent)
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        self.input = QLineEdit()
+        self.input.setPlaceholderText(placeholder)
+        self.input.setFixedHeight(35)
+        self.input.setStyleSheet("""
+            QLineEdit {
+                border: 1px solid #aaa;
+                border-radius: 10px;
+                padding: 0 12px;
+                font-size: 15px;
+            }
+        """)
+
+        search_button = QPushButton("Search")
+        search_button.setFixedHeight(35)
+        search_button.setStyleSheet("""
+            QPushButton {
+                background: #1A73E8;
+                color: white;
+                border-radius: 10px;
+                padding: 0 16px;
+                font-size: 15px;
+            }
+        """)
+
+        layout.addWidget(self.input)
+        layout.addWidget(search_button)
+        self.probe_box = None
+        if with_probes:
+            self.probe_box = ProbeBox(ann)
+            layout.addWidget(self.probe_box)
+
+        self.typing_timer = QTimer(self)
+        self.typing_timer.setSingleShot(True)
+        self.typing_timer.setInterval(self.TYPING_DELAY_MS)
+        self.typing_timer.timeout.connect(self.typed)
+        self.typed_at = None
+        self.input.textChanged.connect(self._on_text_changed)
+        self.input.returnPressed.connect(self._submit)
+        search_button.clicked.connect(self._submit)
+
+    def _on_text_changed(self):
+        self.typed_at = tracer.start()
+        self.typing_timer.start()
+
+    def _submit(self):
+        self.typing_timer.stop()
+        self.submitted.emit()
+
+    def text(self):
+        """Nội dung ô tìm kiếm đã strip và lower"""
+        return self.input.text().strip().lower()
+
+    def n_probe(self):
+        return self.probe_box.value() if self.probe_box is not None else 0
+
+    def set_text(self, text):
+        """Đặt nội dung ô tìm kiếm mà không kích hoạt search-as-you-type"""
+        self.input.blockSignals(True)
+        self.input.setText(text)
+        self.input.blockSignals(False)
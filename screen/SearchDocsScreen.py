@@ -1,179 +1,149 @@
 import os
 import sys
 import json
-import numpy as np
-from numpy.linalg import norm
 
-from PyQt6.QtWidgets import (
-    QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLineEdit,
-    QPushButton, QLabel, QScrollArea
-)
-from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import QWidget, QVBoxLayout
+
+from screen.ResultList import ResultList
+from screen.SearchBar import SearchBar
+from screen.SearchRunner import SearchRunner
+from core.Instrumentation import tracer
 
 
 class SearchDocsScreen(QWidget):
-    def __init__(self, mU, doc_list):
+    # Số tiêu đề tối đa đưa vào danh sách chọn khi có nhiều kết quả khớp (danh sách ảo, chỉ vẽ hàng đang nhìn thấy)
+    MAX_CHOICES = 5000
+    MIN_CHARS = 3
+
+    def __init__(self, doc_engine, doc_list, title_index):
         super().__init__()
         layout = QVBoxLayout(self)
         layout.setContentsMargins(20, 20, 20, 20)
 
         self.doc_list = doc_list
-        self.mU = mU
-
-        search_bar = QHBoxLayout()
-        self.search_input = QLineEdit()
-        self.search_input.setPlaceholderText("Enter document title to get similar documents (at less 3 characters)...")
-        self.search_input.setFixedHeight(35)
-        self.search_input.setStyleSheet("""
-            QLineEdit { 
-                border: 1px solid #aaa; 
-                border-radius: 10px; 
-                padding: 0 12px;
-                font-size: 15px;
-            }
-        """)
-
-        search_button = QPushButton("Search")
-        search_button.setFixedHeight(35)
-        search_button.setStyleSheet("""
-            QPushButton { 
-                background: #1A73E8; 
-                color: white; 
-                border-radius: 10px; 
-                padding: 0 16px; 
-                font-size: 15px;
-            }
-        """)
-        search_button.clicked.connect(self.handle_search)
-
-        search_bar.addWidget(self.search_input)
-        search_bar.addWidget(search_button)
-        layout.addLayout(search_bar)
-
-        scroll = QScrollArea()
-        scroll.setWidgetResizable(True)
-        scroll.setStyleSheet("QScrollArea { border: none; background: transparent; }")
-        layout.addWidget(scroll)
-
-        container = QWidget()
-        self.container_layout = QVBoxLayout(container)
-        self.container_layout.setContentsMargins(10, 10, 10, 10)
-        self.container_layout.setSpacing(12)
-        scroll.setWidget(container)
-
-        self.container_layout.addStretch()
-
-
-    def handle_search(self):
-        result = self._get_search_text()
-
-        if isinstance(result, list):
-            self._show_doc_choices(result)
-            return
-
-        index, value = result
-        if value is None:
-            self._clear_results()
-            self._add_error("Document not found.")
+        self.title_index = title_index
+        self.doc_engine = doc_engine
+        self.mU = doc_engine.matrix
+        # (text, matches) của lần tra tiêu đề trước, chỉ worker thread đọc/ghi
+        self.previous = None
+        # Mốc bắt đầu của lượt tìm đang chờ, để đo latency từ lúc gửi tới lúc hiện kết quả
+        self.search_started = None
+
+        self.search_bar = SearchBar(
+            "Enter document title to get similar documents (at less 3 characters)...",
+            doc_engine.ann, with_probes=True,
+        )
+        self.search_bar.submitted.connect(self.handle_search)
+        self.search_bar.typed.connect(self.handle_typing)
+        layout.addWidget(self.search_bar)
+
+        # --- Results ---
+        self.results = ResultList()
+        self.results.activated.connect(self._on_result_activated)
+        self.choosing = False
+        layout.addWidget(self.results)
+
+        self.runner = SearchRunner(self, on_finished=self._show_results, on_failed=self._show_failure)
+
+
+    def handle_search(self, started=None):
+        text = self._get_search_text()
+        if text is None:
+            self.runner.cancel()
+            self.choosing = False
+            typed = self.search_bar.text()
+            self.results.clear(f"<i style='color: gray;'>Type at least {self.MIN_CHARS} characters</i>" if typed else None)
             return
 
-        self._search_similar_documents(index, value)
-
-
-    def _get_search_text(self):
-        text = self.search_input.text().strip().lower()
-
-        if not text or len(text) < 3:
-            return None, None
-
-        matches = [title for title in self.doc_list if text in title.lower()]
-
-        if len(matches) == 0:
-            return None, None
-
-        if len(matches) > 1:
-            return matches
-
-        selected = matches[0]
-        idx = self.doc_list.index(selected)
-        return idx, self.mU[idx]
+        self.results.set_message("<i style='color: gray;'>Searching...</i>")
+        self.search_started = started if started is not None else tracer.start()
+        self.runner.submit(self._search_title, text, self.search_bar.n_probe())
 
 
-    def _show_doc_choices(self, matches):
-        self._clear_results()
+    def handle_typing(self):
+        # Latency của search-as-you-type tính từ phím gõ cuối, gồm cả debounce
+        self.handle_search(self.search_bar.typed_at)
 
-        label = QLabel("<b>Multiple documents found. Select one:</b>")
-        label.setStyleSheet("font-size: 16px; margin-bottom: 2px;")
-        self.container_layout.addWidget(label)
 
-        for title in matches:
-            btn = QPushButton(title)
-            btn.setStyleSheet("padding: 6px; font-size: 15px; text-align: left;")
-            btn.clicked.connect(lambda _, t=title: self._select_doc(t))
-            self.container_layout.addWidget(btn)
-
-        self.container_layout.addStretch()
-
-
-    def _select_doc(self, title):
-        index = self.doc_list.index(title)
-        value = self.mU[index]
-        self.search_input.setText(self.doc_list[index])
-        self._search_similar_documents(index, value)
-
-
-    def _search_similar_documents(self, index, value):
-        self._clear_results()
-
-        searching_label = QLabel("<i style='color: gray;'>Searching...</i>")
-        searching_label.setStyleSheet("font-size: 16px; margin: 8px 0;")
-        self.container_layout.insertWidget(0, searching_label)
-
-        QApplication.processEvents()
-
-        scores = []
-        for i, v in enumerate(self.mU):
-            if i == index:
-                continue
-            score = self._cosine(value, v)
-            scores.append((score, self.doc_list[i]))
-
-        scores.sort(reverse=True)
-
-        self._clear_results()
-        top_k = min(20, len(scores))
-
-        header = QLabel("<b>Top related documents:</b>")
-        header.setStyleSheet("font-size: 17px; margin-bottom: 12px;")
-        self.container_layout.addWidget(header)
+    def _get_search_text(self):
+        text = self.search_bar.text()
 
-        for i in range(top_k):
-            title = scores[i][1]
-            title_label = QLabel(f'<b style="color:#1A0DAB; font-size:16px;">{title}</b>')
-            title_label.setWordWrap(True)
-            title_label.setStyleSheet("margin-bottom: 6px; padding: 4px;")
-            self.container_layout.addWidget(title_label)
+        if not text or len(text) < self.MIN_CHARS:
+            return None
+        return text
 
-        self.container_layout.addStretch()
 
+    def _search_title(self, text, n_probe):
+        """Chạy trên worker thread: nhiều tiêu đề khớp thì trả về danh sách chọn, đúng một thì tìm luôn
 
-    def _clear_results(self):
-        while self.container_layout.count():
-            item = self.container_layout.takeAt(0)
-            if item:
-                widget = item.widget()
-                if widget:
-                    widget.deleteLater()
-        self.container_layout.addStretch()
+        Khi text chỉ là truy vấn trước gõ thêm ký tự, tập khớp mới nằm trong tập khớp cũ nên chỉ lọc lại tập đó.
+        """
+        within = None
+        if self.previous is not None and self.previous[0] in text:
+            within = self.previous[1]
+        matches, found = self.title_index.search(text, limit=self.MAX_CHOICES, within=within)
+        self.previous = (text, found)
+        total = len(found)
 
-    def _add_error(self, msg):
-        label = QLabel(f"<b style='color:red;'>{msg}</b>")
-        label.setStyleSheet("font-size: 15px; margin: 8px 0;")
-        self.container_layout.insertWidget(0, label)
+        if len(matches) == 0:
+            return ("missing",)
 
-    def _cosine(self, a, b):
-        na = norm(a)
-        nb = norm(b)
-        if na == 0 or nb == 0:
-            return 0
-        return float(np.dot(a, b) / (na * nb + 1e-9))
+        if len(matches) > 1:
+            return "choices", matches, total
+
+        return self._search_row(matches[0], n_probe)
+
+
+    def _search_row(self, index, n_probe):
+        """Chạy trên worker thread"""
+        indices, scores = self.doc_engine.query_row(index, k=20, n_probe=n_probe)
+        return "similar", indices, scores
+
+
+    def _show_results(self, result):
+        kind = result[0]
+        if kind == "missing":
+            self.runner.cancel()
+            self.choosing = False
+            self.results.clear("<b style='color:red; font-size: 15px;'>Document not found.</b>")
+        elif kind == "choices":
+            self._show_doc_choices(*result[1:])
+        else:
+            self.choosing = False
+            _, indices, scores = result
+            self.results.show_results(
+                self.doc_list, indices, scores,
+                "<b style='font-size: 17px;'>Top related documents:</b>",
+            )
+        tracer.finish(f"search.docs.{kind}", self.search_started)
+
+
+    def _show_failure(self, error):
+        tracer.finish("search.docs", self.search_started, failed=True)
+        self.choosing = False
+        self.results.clear("<b style='color:red; font-size: 15px;'>Search failed</b>")
+        print(error, file=sys.stderr)
+
+
+    def _show_doc_choices(self, matches, total):
+        message = "<b>Multiple documents found. Select one:</b>"
+        if total > len(matches):
+            message += (
+                f"<br><i style='color: gray; font-size: 14px;'>Showing {len(matches):,} of {total:,} matches, "
+                "refine the title to narrow down.</i>"
+            )
+        self.choosing = True
+        self.results.show_results(self.doc_list, matches, message=message)
+
+
+    def _on_result_activated(self, index):
+        # Chỉ danh sách chọn tiêu đề mới dẫn tới tìm kiếm, danh sách kết quả thì không
+        if self.choosing:
+            self._select_doc(index)
+
+
+    def _select_doc(self, index):
+        self.search_bar.set_text(self.doc_list[index])
+        self.results.set_message("<i style='color: gray;'>Searching...</i>")
+        self.search_started = tracer.start()
+        self.runner.submit(self._search_row, index, self.search_bar.n_probe())
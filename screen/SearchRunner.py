@@ -0,0 +1,80 @@
+import traceback
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from core.Instrumentation import tracer
+
+
+class _Job(QRunnable):
+    def __init__(self, runner, generation, fn, args):
+        super().__init__()
+        self.runner = runner
+        self.generation = generation
+        self.fn = fn
+        self.args = args
+
+    def run(self):
+        try:
+            with tracer.span("search.compute", fn=self.fn.__name__):
+                value, ok = self.fn(*self.args), True
+        except Exception:
+            value, ok = traceback.format_exc(), False
+        # Signal của runner (sống ở GUI thread) nên kết quả được đưa về GUI thread qua hàng đợi sự kiện
+        self.runner._completed.emit(self.generation, ok, value)
+
+
+class SearchRunner(QObject):
+    """Chạy tìm kiếm trên QThreadPool, mỗi màn hình tối đa một job tại một thời điểm
+
+    Mỗi lần submit tăng generation; job mới chưa chạy sẽ thay thế job đang chờ, và kết quả của
+    generation cũ bị bỏ qua. Nhờ vậy gõ/bấm liên tục không làm dồn việc, chỉ truy vấn mới nhất
+    được trả về qua `finished(result)` (hoặc `failed(traceback)`).
+    """
+
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    _completed = pyqtSignal(int, bool, object)
+
+    def __init__(self, parent=None, pool=None, on_finished=None, on_failed=None):
+        super().__init__(parent)
+        self.pool = pool or QThreadPool.globalInstance()
+        if on_finished is not None:
+            self.finished.connect(on_finished)
+        if on_failed is not None:
+            self.failed.connect(on_failed)
+        self.generation = 0
+        self.running = False
+        self.pending = None
+        self._completed.connect(self._on_completed)
+
+    def submit(self, fn, *args):
+        """Xếp fn(*args) chạy ở background, thay thế job đang chờ; trả về generation của job"""
+        self.generation += 1
+        if self.pending is not None:
+            tracer.count("search.superseded")
+        self.pending = (self.generation, fn, args)
+        if not self.running:
+            self._start_next()
+        return self.generation
+
+    def cancel(self):
+        """Bỏ job đang chờ và kết quả của job đang chạy"""
+        self.generation += 1
+        self.pending = None
+
+    def is_busy(self):
+        return self.running or self.pending is not None
+
+    def _start_next(self):
+        job, self.pending = self.pending, None
+        self.running = job is not None
+        if job is not None:
+            self.pool.start(_Job(self, *job))
+
+    def _on_completed(self, generation, ok, value):
+        if generation == self.generation:
+            if ok:
+                self.finished.emit(value)
+            else:
+                self.failed.emit(value)
+        self._start_next()
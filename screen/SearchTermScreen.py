@@ -1,141 +1,100 @@
 import os
 import sys
 import json
-import numpy as np
-from numpy.linalg import norm
 
-from PyQt6.QtWidgets import (
-    QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLineEdit,
-    QPushButton, QLabel, QScrollArea
-)
-from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import QWidget, QVBoxLayout
+
+from screen.ResultList import ResultList
+from screen.SearchBar import SearchBar
+from screen.SearchRunner import SearchRunner
+from core.Instrumentation import tracer
 
 
 class SearchTermScreen(QWidget):
-    def __init__(self, term_list, mV):
+    def __init__(self, vocabulary, term_engine):
         super().__init__()
         layout = QVBoxLayout(self)
         layout.setContentsMargins(20, 20, 20, 20)
         # Init data
-        self.term_list = term_list
-        self.mV = mV
+        self.vocabulary = vocabulary
+        self.term_list = vocabulary.terms
+        self.term_engine = term_engine
+        self.mV = term_engine.matrix
+        self.last_rows = None
+        # Mốc bắt đầu của lượt tìm đang chờ, để đo latency từ lúc gửi tới lúc hiện kết quả
+        self.search_started = None
 
         # --- Search bar ---
-        search_bar = QHBoxLayout()
-        self.search_input = QLineEdit()
-        self.search_input.setPlaceholderText("Enter one term to get term relevance...")
-        self.search_input.setFixedHeight(35)
-        self.search_input.setStyleSheet("""
-            QLineEdit { 
-                border: 1px solid #aaa; 
-                border-radius: 10px; 
-                padding: 0 12px;
-                font-size: 15px;
-            }
-        """)
-
-        search_button = QPushButton("Search")
-        search_button.setFixedHeight(35)
-        search_button.setStyleSheet("""
-            QPushButton { 
-                background: #1A73E8; 
-                color: white; 
-                border-radius: 10px; 
-                padding: 0 16px; 
-                font-size: 15px;
-            }
-        """)
-        search_button.clicked.connect(self.handle_search)
-
-        search_bar.addWidget(self.search_input)
-        search_bar.addWidget(search_button)
-        layout.addLayout(search_bar)
-
-        # --- Scroll area ---
-        scroll = QScrollArea()
-        scroll.setWidgetResizable(True)
-        scroll.setStyleSheet("QScrollArea { border: none; background: transparent; }")
-        layout.addWidget(scroll)
-
-        # --- Results container ---
-        container = QWidget()
-        self.container_layout = QVBoxLayout(container)
-        self.container_layout.setContentsMargins(10, 10, 10, 10)
-        self.container_layout.setSpacing(12)  
-        scroll.setWidget(container)
-
-        self.container_layout.addStretch()
+        self.search_bar = SearchBar("Enter one or more terms to get term relevance...")
+        self.search_bar.submitted.connect(self.handle_search)
+        self.search_bar.typed.connect(self.handle_typing)
+        layout.addWidget(self.search_bar)
 
+        # --- Results ---
+        self.results = ResultList()
+        layout.addWidget(self.results)
 
-    def handle_search(self):
-        index, value = self._get_search_text()
-        if value is None:
-            self._clear_results()
-            not_found_label = QLabel("<b style='color: red;'>Term not found</b>")
-            not_found_label.setStyleSheet("font-size: 16px; margin: 8px 0;")
-            self.container_layout.insertWidget(0, not_found_label)
-            self.container_layout.addStretch()
-            return
+        self.runner = SearchRunner(self, on_finished=self._show_results, on_failed=self._show_failure)
 
-        self._clear_results()
 
-        searching_label = QLabel("<i style='color: gray;'>Searching...</i>")
-        searching_label.setStyleSheet("font-size: 16px; margin: 8px 0;")
-        self.container_layout.insertWidget(0, searching_label)
+    def handle_search(self):
+        """Enter hoặc nút Search: báo lỗi nếu truy vấn không có term nào trong từ điển"""
+        rows, unknown = self._get_search_text()
+        if not rows:
+            self.runner.cancel()
+            self.last_rows = None
+            self.results.clear("<b style='color: red;'>Term not found</b>")
+            return
+        self._submit(rows, unknown, tracer.start())
+
+    def handle_typing(self):
+        """Search-as-you-type: khi chưa gõ xong term đầu tiên thì giữ kết quả cũ và chỉ gợi ý"""
+        rows, unknown = self._get_search_text()
+        if not rows:
+            self.runner.cancel()
+            self.last_rows = None
+            if self.search_bar.text():
+                self.results.set_message("<i style='color: gray;'>No known term yet, press Enter to search</i>")
+            else:
+                self.results.clear()
+            return
+        self._submit(rows, unknown, self.search_bar.typed_at)
 
-        QApplication.processEvents()
+    def _submit(self, rows, unknown, started):
+        # Đang gõ dở một term chưa có trong từ điển: tập term đã biết không đổi nên giữ nguyên kết quả
+        if rows == self.last_rows:
+            if not self.runner.is_busy():
+                self.results.set_message(self._ignored_message(unknown))
+            return
+        self.last_rows = rows
 
+        self.results.set_message("<i style='color: gray;'>Searching...</i>")
         # Compute similarity
-        scores = []
-        for i, v in enumerate(self.mV):
-            if i == index:
-                continue
-            score = self._cosine(value, v)
-            scores.append((score, self.term_list[i]))
-
-        scores.sort(reverse=True)
+        self.search_started = started
+        self.runner.submit(self._search, rows, unknown)
 
-        self._clear_results()
+    def _search(self, rows, unknown):
+        """Chạy trên worker thread"""
+        indices, scores = self.term_engine.query_rows(rows, k=20)
+        return indices, scores, unknown
 
-        for i in range(min(20, len(scores))):
-            title = scores[i][1]
-            title_label = QLabel(f'<b style="color:#1A0DAB; font-size:16px;">{title}</b>')
-            title_label.setWordWrap(True)
-            title_label.setStyleSheet("margin-bottom: 6px; padding: 4px;")
+    def _show_results(self, result):
+        indices, scores, unknown = result
+        self.results.show_results(self.term_list, indices, scores, self._ignored_message(unknown))
+        tracer.finish("search.terms", self.search_started)
 
-            self.container_layout.addWidget(title_label)
-
-        self.container_layout.addStretch()
+    def _show_failure(self, error):
+        tracer.finish("search.terms", self.search_started, failed=True)
+        self.last_rows = None
+        self.results.clear("<b style='color: red;'>Search failed</b>")
+        print(error, file=sys.stderr)
 
 
     def _get_search_text(self):
-        text = self.search_input.text().strip().lower()
-
-        for t in text.split():
-            if t in self.term_list:
-                try:
-                    index  = self.term_list.index(t)
-                    return index, self.mV[index]
-                except:
-                    return None, None
-        return None, None
-
-    def _clear_results(self):
-        # Remove all items (widgets + stretch)
-        while self.container_layout.count():
-            item = self.container_layout.takeAt(0)
-            if item:
-                widget = item.widget()
-                if widget:
-                    widget.deleteLater()
-
-        # Add stretch again
-        self.container_layout.addStretch()
-
-
-    def _cosine(self, a, b):
-        na = norm(a)
-        nb = norm(b)
-        if na == 0 or nb == 0:
-            return 0
-        return float(np.dot(a, b) / (na * nb + 1e-9))
+        """Tra mọi token của truy vấn trong một lượt: trả về (rows, unknown)"""
+        return self.vocabulary.lookup(self.search_bar.text().split())
+
+    def _ignored_message(self, unknown):
+        if not unknown:
+            return None
+        return f"<i style='color: gray; font-size: 14px;'>Ignored unknown terms: {', '.join(unknown)}</i>"
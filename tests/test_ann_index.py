@@ -0,0 +1,21 @@
+import numpy as np
+
+from core.AnnIndex import IVFIndex, index_path, load_index
+from core.SimilarityEngine import normalize_rows
+
+
+def _normed(n, dim, seed=0):
+    rng = np.random.default_rng(seed)
+    return normalize_rows(rng.standard_normal((n, dim))).astype(np.float32)
+
+
+def test_index_for_another_matrix_is_not_loaded(tmp_path):
+    json_path = tmp_path / "doc_embeddings.json"
+    json_path.write_text("", encoding="utf-8")
+    IVFIndex.build(_normed(500, 8), n_lists=10).save(index_path(json_path))
+
+    index = load_index(json_path, (500, 8))
+    assert index is not None
+    assert (index.n_rows, index.dim) == (500, 8)
+    assert load_index(json_path, (800, 8)) is None
+    assert load_index(json_path, (500, 16)) is None
@@ -0,0 +1,35 @@
+import json
+
+import pytest
+
+from core.EmbeddingStore import convert, load_embeddings, load_store, store_paths
+
+
+def _write_terms(path, terms):
+    with open(path, "w", encoding="utf-8") as outfile:
+        for i, term in enumerate(terms):
+            outfile.write(json.dumps({"term": term, "embedding": [i, 1.0, 2.0]}) + "\n")
+
+
+def test_names_with_carriage_return_round_trip(tmp_path):
+    path = tmp_path / "term_embeddings.json"
+    _write_terms(path, ["a", "b\rc", "d"])
+    convert(path, "term", workers=1)
+
+    names, matrix, _ = load_store(path)
+    assert names == ["a", "b\rc", "d"]
+    assert matrix.shape == (3, 3)
+    assert matrix[2, 0] == 2
+
+
+def test_store_with_wrong_name_count_is_rejected(tmp_path):
+    path = tmp_path / "term_embeddings.json"
+    _write_terms(path, ["a", "b", "c"])
+    convert(path, "term", workers=1)
+    store_paths(path)["names"].write_text("a\nb", encoding="utf-8")
+
+    with pytest.raises(ValueError):
+        load_store(path)
+    names, matrix, _ = load_embeddings(path, "term")
+    assert names == ["a", "b", "c"]
+    assert len(matrix) == 3
@@ -0,0 +1,66 @@
+import json
+
+import numpy as np
+
+from core.JsonIngest import ingest_parallel, parse_lines, stream_embeddings
+
+
+def _line(term, embedding):
+    return json.dumps({"term": term, "embedding": embedding}) + "\n"
+
+
+def test_short_and_long_rows_in_one_chunk_are_skipped():
+    lines = [
+        _line("a", [1, 2, 3]),
+        _line("short", [1, 2]),
+        _line("long", [4, 5, 6, 7]),
+        _line("b", [8, 9, 10]),
+    ]
+    names, block, errors = parse_lines(lines, "term", False, 3, np.float32)
+
+    assert names == ["a", "b"]
+    np.testing.assert_array_equal(block, [[1, 2, 3], [8, 9, 10]])
+    assert [line_no for line_no, _ in errors] == [2, 3]
+
+
+def test_stream_embeddings_reports_mismatched_rows(tmp_path):
+    path = tmp_path / "term_embeddings.json"
+    path.write_text(
+        _line("a", [1, 2, 3]) + _line("short", [1, 2]) + _line("long", [4, 5, 6, 7]) + _line("b", [8, 9, 10]),
+        encoding="utf-8",
+    )
+    names, matrix, report = stream_embeddings(path, "term")
+
+    assert names == ["a", "b"]
+    np.testing.assert_array_equal(matrix, [[1, 2, 3], [8, 9, 10]])
+    assert report["rows"] == 2
+    assert report["skipped"] == 2
+
+
+def test_bad_first_row_does_not_reject_good_rows(tmp_path):
+    path = tmp_path / "term_embeddings.json"
+    path.write_text(
+        _line("x", [1, 2]) + _line("a", [1, 2, 3]) + _line("b", [4, 5, 6]),
+        encoding="utf-8",
+    )
+    names, matrix, report = stream_embeddings(path, "term")
+
+    assert names == ["a", "b"]
+    np.testing.assert_array_equal(matrix, [[1, 2, 3], [4, 5, 6]])
+    assert report["skipped"] == 1
+
+
+def test_parallel_ingest_with_bad_leading_rows(tmp_path):
+    path = tmp_path / "term_embeddings.json"
+    bad = "".join(_line(f"bad{i}", [1, 2]) for i in range(6))
+    good = "".join(_line(f"t{i}", [i, 1, 2]) for i in range(500))
+    path.write_text(bad + good, encoding="utf-8")
+    out_path = tmp_path / "term_embeddings.npy"
+
+    names, report = ingest_parallel(path, "term", out_path, workers=2, chunk_rows=64)
+
+    matrix = np.load(out_path)
+    assert names == [f"t{i}" for i in range(500)]
+    assert matrix.shape == (500, 3)
+    np.testing.assert_array_equal(matrix[:, 0], np.arange(500))
+    assert report["skipped"] == 6
@@ -0,0 +1,23 @@
+import numpy as np
+
+from core.Quantization import Int8Matrix, load_quantized
+from core.SimilarityEngine import normalize_rows
+
+
+def _normed(n, dim, seed=0):
+    rng = np.random.default_rng(seed)
+    return normalize_rows(rng.standard_normal((n, dim))).astype(np.float32)
+
+
+def test_int8_store_for_another_matrix_is_rebuilt(tmp_path):
+    json_path = tmp_path / "doc_embeddings.json"
+    json_path.write_text("", encoding="utf-8")
+    Int8Matrix.from_matrix(_normed(300, 8)).save(json_path)
+
+    normed = _normed(500, 8, seed=1)
+    quantized = load_quantized(json_path, normed)
+    assert quantized.codes.shape == normed.shape
+    assert len(quantized.scales) == len(normed)
+
+    same = load_quantized(json_path, _normed(300, 8))
+    assert same.codes.shape == (300, 8)